@@ -1,4 +1,6 @@
-from pydantic_settings import BaseSettings
+import functools
+
+from pydantic import BaseSettings
 
 class Settings(BaseSettings):
     APP_NAME: str = "CodeDocGen API"
@@ -17,5 +19,15 @@ class Settings(BaseSettings):
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
+        case_sensitive = True  # Field names are already the exact env var names
+        frozen = True
+        extra = "ignore"
+
+@functools.lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Return the process-wide settings, reading .env only on first use.
 
-settings = Settings() 
\ No newline at end of file
+    Usable directly or as a FastAPI dependency via Depends(get_settings).
+    """
+    return Settings()
@@ -0,0 +1,37 @@
+import fnmatch
+from typing import Optional, Sequence
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
+
+
+class OriginSetCORSMiddleware(CORSMiddleware):
+    """
+    CORSMiddleware that checks exact origins against a frozenset and
+    wildcard origins (e.g. "https://*.vercel.app") against one compiled regex.
+
+    Starlette keeps allow_origins and allow_methods as the sequences it was
+    given and scans them on every request carrying an Origin header.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        allow_origins: Sequence[str] = (),
+        allow_origin_regex: Optional[str] = None,
+        **kwargs,
+    ) -> None:
+        exact_origins = frozenset(o for o in allow_origins if o == "*" or "*" not in o)
+        wildcard_patterns = [fnmatch.translate(o) for o in allow_origins if o != "*" and "*" in o]
+        if allow_origin_regex:
+            wildcard_patterns.append(allow_origin_regex)
+
+        super().__init__(
+            app,
+            allow_origins=exact_origins,
+            allow_origin_regex="|".join(wildcard_patterns) or None,
+            **kwargs,
+        )
+        # The Access-Control-Allow-Methods header was rendered above; keep a set
+        # for the per-preflight membership check.
+        self.allow_methods = frozenset(self.allow_methods)
@@ -1,58 +1,97 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 import logging
 import os
-from dotenv import load_dotenv
+import sys
 
-# Load environment variables
-load_dotenv()
+import anyio.to_thread
+import orjson
+
+from .core.cors import OriginSetCORSMiddleware
+
+# Load environment variables from .env in development only. Production
+# deployments (ENV != "dev") get their environment from the platform and never
+# import python-dotenv; SKIP_DOTENV also bypasses the lookup.
+if os.getenv("ENV", "dev") == "dev" and not os.getenv("SKIP_DOTENV"):
+    from dotenv import find_dotenv, load_dotenv
+
+    _dotenv_path = find_dotenv(usecwd=True)
+    if _dotenv_path and os.path.isfile(_dotenv_path):
+        load_dotenv(_dotenv_path, override=False)
 
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 )
+# The format above never prints process/thread info or source locations, so
+# skip collecting them for every LogRecord.
+logging.logProcesses = False
+logging.logThreads = False
+logging.logMultiprocessing = False
+logging._srcfile = None
 
 app = FastAPI(
     title="CodeDocGen API",
     description="API for CodeDocGen - Interactive Spring Boot Documentation & Testing Companion",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware configuration - MUST come before router inclusion
-origins = ["https://codedocgen-frontend.vercel.app"]
-
-# Add localhost origins for development
-dev_origins = [
+DEFAULT_ORIGINS = (
+    "https://codedocgen-frontend.vercel.app",
+    # Localhost origins for development
     "http://localhost:3000",
     "localhost:3000",
     "http://127.0.0.1:3000",
     "127.0.0.1:3000",
-]
-origins.extend(dev_origins)
+)
 
-# Add any additional origins from environment variable
-if os.getenv("ALLOW_ORIGINS"):
-    additional_origins = os.getenv("ALLOW_ORIGINS").split(",")
-    origins.extend(additional_origins)
+# Add any additional origins from environment variable (read once at import).
+# Entries are stripped, de-duplicated and interned so per-request comparisons
+# against the Origin header hash each string only once per process.
+_extra_origins = os.getenv("ALLOW_ORIGINS")
+origins = tuple(
+    sys.intern(origin)
+    for origin in dict.fromkeys(
+        o.strip() for o in (*DEFAULT_ORIGINS, *(_extra_origins.split(",") if _extra_origins else ()))
+    )
+    if origin
+)
 
 app.add_middleware(
-    CORSMiddleware,
+    OriginSetCORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
-    allow_methods=["*"],  # Ensures OPTIONS requests are handled
-    allow_headers=["*"],
+    allow_methods=("GET", "POST", "OPTIONS"),  # Every method the API exposes, plus preflight
+    allow_headers=("Authorization", "Content-Type", "Accept"),
 )
 
+# Bodies of the static endpoints, serialized once at import
+_ROOT_BODY = orjson.dumps({"message": "Welcome to CodeDocGen API"})
+_HEALTH_BODY = orjson.dumps({"status": "healthy"})
+
 @app.get("/")
 async def read_root():
-    return {"message": "Welcome to CodeDocGen API"}
+    return Response(content=_ROOT_BODY, media_type="application/json")
 
 @app.get("/.health")
 async def health_check():
-    return {"status": "healthy"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
+
+# Threads Starlette may run sync dependencies and streamed sync iterators on
+# at once. anyio's default of 40 fills up when several requests are waiting on
+# parsers that block on disk.
+WORKER_THREADS = int(os.getenv("WORKER_THREADS", 64))
+
+@app.on_event("startup")
+async def configure_thread_limiter():
+    anyio.to_thread.current_default_thread_limiter().total_tokens = WORKER_THREADS
 
-# Include routers - AFTER middleware setup
+# Include routers - AFTER middleware setup. The router is registered at import
+# so it never depends on startup running exactly once; the services it pulls
+# in load GitPython, markdown and requests only when first used.
 from .routers import repo
 app.include_router(repo.router)
 
@@ -64,4 +103,15 @@ app.include_router(repo.router)
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run("app.main:app", host="0.0.0.0", port=port, reload=True) 
\ No newline at end of file
+    uvicorn.run(
+        "app.main:app",
+        host="0.0.0.0",
+        port=port,
+        # uvloop has no Windows build; httptools does
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools",
+        # Keep idle connections open longer than a typical proxy's idle timeout
+        # so polling frontends reuse them instead of reconnecting
+        timeout_keep_alive=75,
+        reload=os.getenv("ENV", "dev") == "dev"
+    ) 
\ No newline at end of file
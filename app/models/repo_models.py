@@ -1,19 +1,33 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, validator
+from typing import Optional, List
 
 class RepoCredentials(BaseModel):
-    repo_url: HttpUrl
+    repo_url: str
     username: Optional[str] = None # Username might not be needed if token is like a PAT
     password: Optional[str] = None # Could be a password or an access token
 
-class RepoResponse(BaseModel):
+    @validator("repo_url")
+    def validate_repo_url(cls, value: str) -> str:
+        # A scheme check is all cloning needs; HttpUrl's full parse is not required here
+        if not value.startswith(("http://", "https://")):
+            raise ValueError("repo_url must start with http:// or https://")
+        return value
+
+class FrozenModel(BaseModel):
+    # Response models are built once from service output and never modified.
+    # extra is left at the default (ignore) because services return supersets
+    # of these fields (e.g. flow entries carry level/path for the UI).
+    class Config:
+        allow_mutation = False
+
+class RepoResponse(FrozenModel):
     status: str  # "success" or "error"
     message: str
     repo_name: Optional[str] = None
     repo_path: Optional[str] = None
     error_details: Optional[str] = None
 
-class ProjectTypeResponse(BaseModel):
+class ProjectTypeResponse(FrozenModel):
     status: str  # "success" or "error"
     message: Optional[str] = None
     is_maven: Optional[bool] = None
@@ -23,23 +37,23 @@ class ProjectTypeResponse(BaseModel):
     project_type: Optional[str] = None
     error_details: Optional[str] = None
 
-class EndpointInfo(BaseModel):
+class EndpointInfo(FrozenModel):
     controller: str
     method: str
     http_method: str
     path: str
 
-class EndpointResponse(BaseModel):
+class EndpointResponse(FrozenModel):
     status: str  # "success" or "error"
     message: Optional[str] = None
     endpoints: Optional[List[EndpointInfo]] = None
     error_details: Optional[str] = None 
 
-class MethodParameter(BaseModel):
+class MethodParameter(FrozenModel):
     type: str
     name: str
 
-class MethodCall(BaseModel):
+class MethodCall(FrozenModel):
     class_name: str
     method: str
     class_type: Optional[str] = "unknown"
@@ -49,21 +63,32 @@ class MethodCall(BaseModel):
 # Important: this is needed for the recursive model
 MethodCall.update_forward_refs()
 
-class FlowEntry(BaseModel):
+class MethodCallNode(FrozenModel):
+    class_name: str
+    method: str
+    class_type: Optional[str] = "unknown"
+    parent: int = -1  # Index of the calling node; -1 when called directly by the flow entry
+
+class MethodCallGraph(FrozenModel):
+    # Call tree flattened in depth-first order; rebuild it from each node's parent index
+    nodes: List[MethodCallNode]
+
+class FlowEntry(FrozenModel):
     class_name: str
     class_type: str
     method: str
     parameters: Optional[List[MethodParameter]] = None
     return_type: str
     calls: Optional[List[MethodCall]] = None
+    call_graph: Optional[MethodCallGraph] = None
 
-class EndpointFlow(BaseModel):
+class EndpointFlow(FrozenModel):
     controller: str
     endpoint: str
     http_method: str
     flow: List[FlowEntry]
 
-class FlowResponse(BaseModel):
+class FlowResponse(FrozenModel):
     status: str  # "success" or "error"
     message: Optional[str] = None
     flows: Optional[List[EndpointFlow]] = None
@@ -1,6 +1,7 @@
-from fastapi import APIRouter, HTTPException, status, BackgroundTasks, Response, Query
+from fastapi import APIRouter, HTTPException, status, BackgroundTasks, Request, Response, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from ..models.repo_models import RepoCredentials, RepoResponse, ProjectTypeResponse, EndpointResponse, FlowResponse
+from ..models.repo_models import RepoCredentials, RepoResponse, ProjectTypeResponse, EndpointResponse, EndpointFlow, FlowResponse
 from ..services.repo_service import RepoService
 from ..services.project_analyzer import ProjectAnalyzer
 from ..services.endpoint_parser import EndpointParser
@@ -16,15 +17,13 @@ from ..services.role_filter import RoleFilter
 from ..services.schema_mapper import SchemaMapper
 from ..services.publish_payload_builder import PublishPayloadBuilder
 from ..services.markdown_to_confluence_html import MarkdownToConfluenceConverter
+import asyncio
+import functools
 import logging
-import git
 import os
-import tempfile
-import json
-# Import plantuml only when needed, not at the module level
-# import plantuml
-from pathlib import Path
-from typing import Dict, Any, List, Optional
+import re
+import orjson
+from typing import Dict, Any, Iterator, List, Optional
 
 router = APIRouter(
     prefix="/api/repo",
@@ -34,15 +33,29 @@ router = APIRouter(
 logger = logging.getLogger(__name__)
 repo_service = RepoService()
 project_analyzer = ProjectAnalyzer()
-endpoint_parser = EndpointParser()
 swagger_generator = SwaggerGenerator()
 markdown_exporter = MarkdownExporter()
 feature_builder = FeatureBuilder()
-flow_analyzer = FlowAnalyzer()
 role_filter = RoleFilter()
 schema_mapper = SchemaMapper()
-# Define REPO_BASE_DIR for entity functions
-REPO_BASE_DIR = repo_service.base_dir
+
+# Sections that can be published to Confluence
+_VALID_SECTIONS = frozenset({"api_docs", "features", "diagrams", "flows"})
+
+# Splits a CamelCase entity name into words for product owners
+_CAMEL_SPLIT = re.compile(r'(?<!^)(?=[A-Z])')
+
+# Clients may reuse a response but must revalidate it with its ETag first
+_CACHE_CONTROL = "private, max-age=0, must-revalidate"
+
+# Prefixed to every ETag. Bump it in any release that changes what a response
+# derived from a clone contains (diagram text, swagger layout, ...), so clients
+# holding bodies from an earlier release refetch them instead of getting 304.
+_RESPONSE_FORMAT_VERSION = "1"
+
+def _attachment_headers(filename: str) -> Dict[str, str]:
+    """Response headers that make the browser download the body as filename."""
+    return {"Content-Disposition": f"attachment; filename={filename}"}
 
 @router.post("/submit-repo", status_code=status.HTTP_200_OK)
 async def submit_repository_details(credentials: RepoCredentials):
@@ -51,11 +64,11 @@ async def submit_repository_details(credentials: RepoCredentials):
     Returns acknowledgment of receipt.
     """
     try:
-        logger.info(f"Received repository submission: URL={credentials.repo_url}, Username={credentials.username}")
+        logger.info("Received repository submission: URL=%s, Username=%s", credentials.repo_url, credentials.username)
         # For backwards compatibility with Iteration 1
         return {"message": "Repository details received successfully", "repo_url": str(credentials.repo_url)}
     except Exception as e:
-        logger.error(f"Error processing repository submission: {e}", exc_info=True)
+        logger.error("Error processing repository submission: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -72,10 +85,11 @@ async def clone_repository(credentials: RepoCredentials, background_tasks: Backg
         username = credentials.username
         password = credentials.password
         
-        logger.info(f"Attempting to clone repository: {repo_url}")
+        logger.info("Attempting to clone repository: %s", repo_url)
         
         # Clone the repository
-        result = repo_service.clone_repository(
+        result = await asyncio.to_thread(
+            repo_service.clone_repository,
             repo_url=repo_url,
             username=username,
             password=password
@@ -83,7 +97,7 @@ async def clone_repository(credentials: RepoCredentials, background_tasks: Backg
         
         # Check if cloning was successful
         if result["status"] == "error":
-            logger.error(f"Failed to clone repository: {result['message']}")
+            logger.error("Failed to clone repository: %s", result['message'])
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=result["message"]
@@ -95,54 +109,58 @@ async def clone_repository(credentials: RepoCredentials, background_tasks: Backg
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error cloning repository: {e}", exc_info=True)
+        logger.error("Unexpected error cloning repository: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
+@router.post("/invalidate/{repo_name}", status_code=status.HTTP_200_OK)
+async def invalidate_repository_cache(repo_name: str):
+    """
+    Drops cached analysis results so the next requests re-parse the repository.
+    Only needed when a clone is changed in place; a new commit is picked up automatically.
+    """
+    repo_path = _get_repo_path(repo_name)
+    
+    # Give the clone a new version so clients holding the old ETag refetch
+    _bump_invalidation_count(repo_path)
+    
+    # The caches are keyed by clone path and revision, not by name, so clear them all
+    for cache in (_resolve_repo_dir, _analyzed_project, _parsed_architecture,
+                  _analyzed_flows, _entity_parser, _renderer):
+        cache.cache_clear()
+    
+    logger.info("Invalidated cached analysis after request for repository: %s", repo_name)
+    return {"status": "success", "message": f"Cleared cached analysis for {repo_name}"}
+
 @router.get("/analyze/{repo_name}", response_model=ProjectTypeResponse, status_code=status.HTTP_200_OK)
-async def analyze_repository(repo_name: str):
+async def analyze_repository(repo_name: str, request: Request, response: Response):
     """
     Analyzes the cloned repository to identify its type (Maven/Gradle) and if it's a Spring Boot project.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
+        repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
-        logger.info(f"Analyzing repository: {repo_name} using path {repo_path}")
+        logger.info("Analyzing repository: %s using path %s", repo_name, repo_path)
         
         # Analyze the project
-        result = project_analyzer.analyze_project(repo_path)
+        result = await asyncio.to_thread(_analyzed_project, repo_path, version)
         
         # Check if analysis was successful
         if result["status"] == "error":
-            logger.error(f"Failed to analyze repository: {result['message']}")
+            logger.error("Failed to analyze repository: %s", result['message'])
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=result["message"]
             )
         
-        # Enhance the result with a friendly message
-        result["message"] = f"Identified as {result['project_type']} project using {result['build_system']}"
+        # Enhance the result with a friendly message (the cached analysis itself stays untouched)
+        result = {**result, "message": f"Identified as {result['project_type']} project using {result['build_system']}"}
         
         # Return the response
         return result
@@ -150,44 +168,29 @@ async def analyze_repository(repo_name: str):
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error analyzing repository: {e}", exc_info=True)
+        logger.error("Unexpected error analyzing repository: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         ) 
 
 @router.get("/endpoints/{repo_name}", response_model=EndpointResponse, status_code=status.HTTP_200_OK)
-async def get_repository_endpoints(repo_name: str, role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)")):
+async def get_repository_endpoints(repo_name: str, request: Request, response: Response, role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)")):
     """
     Parses the cloned repository to identify REST controllers and their exposed endpoint methods.
     Optionally filters endpoint data based on the specified user role.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
+        repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
-        logger.info(f"Parsing endpoints in repository: {repo_name} using path {repo_path}")
+        logger.info("Parsing endpoints in repository: %s using path %s", repo_name, repo_path)
         
         # First check if this is a Spring Boot project
-        project_info = project_analyzer.analyze_project(repo_path)
+        project_info = await asyncio.to_thread(_analyzed_project, repo_path, version)
         
         if project_info["status"] == "error":
             return {
@@ -198,28 +201,30 @@ async def get_repository_endpoints(repo_name: str, role: Optional[str] = Query(N
         
         # Continue even if not Spring Boot, but log a warning
         if not project_info.get("is_spring_boot", False):
-            logger.warning(f"Repository {repo_name} is not identified as a Spring Boot project. Endpoint detection may be unreliable.")
+            logger.warning("Repository %s is not identified as a Spring Boot project. Endpoint detection may be unreliable.", repo_name)
         
         # Parse the endpoints
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        architecture_data = await asyncio.to_thread(_parsed_architecture, repo_path, version)
         
         # Extract just the endpoints list from the architecture_data
         endpoints = architecture_data.get("endpoints", [])
         
         # Apply role-based filtering if a role is specified
         if role:
-            logger.info(f"Filtering endpoints for role: {role}")
+            logger.info("Filtering endpoints for role: %s", role)
             endpoints = role_filter.filter_endpoints(endpoints, role)
         
         # Convert the detailed endpoint dictionaries to simplified EndpointInfo objects
-        endpoint_info_list = []
-        for endpoint in endpoints:
-            endpoint_info_list.append({
-                "controller": endpoint.get("controller", ""),
-                "method": endpoint.get("method", ""),
-                "http_method": endpoint.get("http_method", ""),
-                "path": endpoint.get("path", "")
-            })
+        # (EndpointParser always sets these four keys on every endpoint)
+        endpoint_info_list = [
+            {
+                "controller": endpoint["controller"],
+                "method": endpoint["method"],
+                "http_method": endpoint["http_method"],
+                "path": endpoint["path"]
+            }
+            for endpoint in endpoints
+        ]
         
         if not endpoint_info_list:
             return {
@@ -238,171 +243,130 @@ async def get_repository_endpoints(repo_name: str, role: Optional[str] = Query(N
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error parsing endpoints: {e}", exc_info=True)
+        logger.error("Unexpected error parsing endpoints: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         ) 
 
 @router.get("/swagger/{repo_name}")
-async def get_repository_openapi_spec(repo_name: str):
+async def get_repository_openapi_spec(repo_name: str, request: Request, response: Response, pretty: bool = Query(False, description="Indent the JSON output")):
     """
     Generates and returns an OpenAPI 3.0 (Swagger) specification for the repository's endpoints.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
-        
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
+        repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
         # Get endpoints from the endpoint parser
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        architecture_data = await asyncio.to_thread(_parsed_architecture, repo_path, version)
         endpoints_info = architecture_data.get("endpoints", [])
         
         if not endpoints_info:
             return Response(
-                content=json.dumps({
-                    "openapi": "3.0.0",
-                    "info": {
-                        "title": f"{repo_name} API",
-                        "description": "No endpoints found in this repository",
-                        "version": "1.0.0"
-                    },
-                    "paths": {}
-                }),
-                media_type="application/json"
+                content=_empty_openapi_bytes(repo_name, pretty),
+                media_type="application/json",
+                headers=response.headers
             )
         
         # Generate the OpenAPI spec
-        openapi_spec = swagger_generator.generate_openapi_spec(endpoints_info, repo_name)
+        openapi_spec = await asyncio.to_thread(swagger_generator.generate_openapi_spec, endpoints_info, repo_name)
         
-        # Return the OpenAPI spec as JSON
-        return Response(
-            content=json.dumps(openapi_spec, indent=2),
-            media_type="application/json"
-        )
+        # Return the OpenAPI spec as JSON, indented only when asked for
+        if pretty:
+            return Response(
+                content=orjson.dumps(openapi_spec, option=orjson.OPT_INDENT_2),
+                media_type="application/json",
+                headers=response.headers
+            )
+        return ORJSONResponse(openapi_spec, headers=response.headers)
     
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating OpenAPI spec: {e}", exc_info=True)
+        logger.error("Unexpected error generating OpenAPI spec: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         ) 
 
+@functools.lru_cache(maxsize=256)
+def _empty_openapi_bytes(repo_name: str, pretty: bool) -> bytes:
+    """Encoded OpenAPI spec for a repository without endpoints, built once per repository."""
+    return orjson.dumps({
+        "openapi": "3.0.0",
+        "info": {
+            "title": f"{repo_name} API",
+            "description": "No endpoints found in this repository",
+            "version": "1.0.0"
+        },
+        "paths": {}
+    }, option=orjson.OPT_INDENT_2 if pretty else 0)
+
 @router.get("/export/markdown/{repo_name}")
-async def export_markdown_documentation(repo_name: str):
+async def export_markdown_documentation(repo_name: str, request: Request, response: Response):
     """
     Generates and returns a Markdown document containing API documentation.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
-        
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
+        repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
         # Get endpoints from the endpoint parser
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        architecture_data = await asyncio.to_thread(_parsed_architecture, repo_path, version)
         endpoints_info = architecture_data.get("endpoints", [])
         
+        headers = {**response.headers, **_attachment_headers(f"{repo_name}_api_documentation.md")}
+        
         if not endpoints_info:
             content = f"# API Documentation for {repo_name}\n\nNo endpoints found in this repository."
             return Response(
                 content=content,
                 media_type="text/markdown",
-                headers={
-                    "Content-Disposition": f"attachment; filename={repo_name}_api_documentation.md"
-                }
+                headers=headers
             )
         
         # Generate the Markdown documentation
-        markdown_content = markdown_exporter.generate_markdown(endpoints_info, repo_name)
+        markdown_content = await asyncio.to_thread(markdown_exporter.generate_markdown, endpoints_info, repo_name)
         
         # Return the Markdown document
         return Response(
             content=markdown_content,
             media_type="text/markdown",
-            headers={
-                "Content-Disposition": f"attachment; filename={repo_name}_api_documentation.md"
-            }
+            headers=headers
         )
     
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating Markdown documentation: {e}", exc_info=True)
+        logger.error("Unexpected error generating Markdown documentation: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         ) 
 
 @router.get("/features/{repo_name}")
-async def get_repository_feature_files(repo_name: str):
+async def get_repository_feature_files(repo_name: str, request: Request, response: Response):
     """
     Generates and returns a list of feature files for the repository's endpoints.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
-        
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
+        repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
         # Get endpoints from the endpoint parser
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        architecture_data = await asyncio.to_thread(_parsed_architecture, repo_path, version)
         endpoints_info = architecture_data.get("endpoints", [])
         
         if not endpoints_info:
@@ -412,15 +376,8 @@ async def get_repository_feature_files(repo_name: str):
                 "feature_files": []
             }
         
-        # Generate feature files
-        feature_files = feature_builder.generate_feature_files(endpoints_info, repo_name)
-        
-        # Add a preview snippet to each feature file
-        for feature in feature_files:
-            content = feature["content"]
-            lines = content.split("\n")
-            preview = "\n".join(lines[:5]) + "..."  # First 5 lines as preview
-            feature["preview"] = preview
+        # Generate feature files, each with a preview snippet of its first 5 lines
+        feature_files = await asyncio.to_thread(feature_builder.generate_feature_files, endpoints_info, repo_name)
         
         return {
             "status": "success",
@@ -432,7 +389,7 @@ async def get_repository_feature_files(repo_name: str):
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating feature files: {e}", exc_info=True)
+        logger.error("Unexpected error generating feature files: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -444,70 +401,37 @@ async def download_feature_files(repo_name: str):
     Generates and returns a ZIP file containing all feature files for the repository.
     """
     try:
-        # First check for repos with unique suffixes 
-        base_dir = repo_service.base_dir
-        possible_dirs = [d for d in os.listdir(base_dir) 
-                         if os.path.isdir(os.path.join(base_dir, d)) and 
-                            (d.startswith(f"{repo_name}_") or d == repo_name)]
-        
-        if not possible_dirs:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
-        
-        # Get the latest directory by modification time (newest clone)
-        repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                               for d in possible_dirs]
-        repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-        latest_dir = repo_dirs_with_mtime[0][0]
-        
-        # Use the latest directory
-        repo_path = os.path.join(base_dir, latest_dir)
+        repo_path = _get_repo_path(repo_name)
         
         # Get endpoints from the endpoint parser
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        architecture_data = await asyncio.to_thread(_parsed_architecture, repo_path, _repo_version(repo_path))
         endpoints_info = architecture_data.get("endpoints", [])
         
-        if not endpoints_info:
-            # Return an empty zip file
-            empty_zip, filename = feature_builder.create_zip_file([], repo_name)
-            return Response(
-                content=empty_zip,
-                media_type="application/zip",
-                headers={
-                    "Content-Disposition": f"attachment; filename={filename}"
-                }
-            )
-        
-        # Generate feature files
-        feature_files = feature_builder.generate_feature_files(endpoints_info, repo_name)
+        # Generate feature files (an empty zip is returned when there are no endpoints)
+        feature_files = []
+        if endpoints_info:
+            feature_files = await asyncio.to_thread(feature_builder.generate_feature_files, endpoints_info, repo_name, preview=False)
         
-        # Create a zip file with all feature files
-        zip_bytes, filename = feature_builder.create_zip_file(feature_files, repo_name)
-        
-        # Return the zip file
-        return Response(
-            content=zip_bytes,
+        # Stream the zip file entry by entry instead of building it in memory
+        zip_chunks, filename = feature_builder.create_zip_stream(feature_files, repo_name)
+        return StreamingResponse(
+            zip_chunks,
             media_type="application/zip",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
+            headers=_attachment_headers(filename)
         )
     
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating feature files ZIP: {e}", exc_info=True)
+        logger.error("Unexpected error generating feature files ZIP: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         ) 
 
 @router.get("/entities/{repo_name}", response_model=Dict[str, Any])
-async def get_entities(repo_name: str, role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)")):
+async def get_entities(repo_name: str, request: Request, response: Response, role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)")):
     """
     Parse the cloned repository to identify entity classes and their relationships.
     Optionally filters entity data based on the specified user role.
@@ -515,22 +439,20 @@ async def get_entities(repo_name: str, role: Optional[str] = Query(None, descrip
     try:
         # Get the repository path
         repo_path = _get_repo_path(repo_name)
-        if not repo_path:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        logger.info(f"Parsing entities in repository: {repo_name} using path {repo_path}")
+        logger.info("Parsing entities in repository: %s using path %s", repo_name, repo_path)
         
         # Parse entities using the service
-        entity_parser = EntityParser(repo_path)
-        entities = entity_parser.parse_entities()
+        entity_parser = _entity_parser(repo_path, version)
+        entities = await asyncio.to_thread(entity_parser.parse_entities)
         
         # Apply role-based filtering if a role is specified
         if role:
-            logger.info(f"Filtering entities for role: {role}")
+            logger.info("Filtering entities for role: %s", role)
             entities = role_filter.filter_entities(entities, role)
         
         # Return the result
@@ -543,183 +465,420 @@ async def get_entities(repo_name: str, role: Optional[str] = Query(None, descrip
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error parsing entities: {e}", exc_info=True)
+        logger.error("Unexpected error parsing entities: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/diagrams/entities/{repo_name}", response_model=Dict[str, Any])
-async def get_entity_diagram(repo_name: str, diagram_type: str = "class"):
+async def get_entity_diagram(repo_name: str, request: Request, response: Response, diagram_type: str = "class"):
     """
     Generates UML diagrams for entity relationships.
     """
     try:
         # Check if the repository exists
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Generate the diagram
-        diagram_generator = PlantUMLGenerator(repo_path)
+        # Generate the diagram from the shared entity parse
+        diagram_generator = PlantUMLGenerator(repo_path, _entity_parser(repo_path, version))
         
         # Use the improved diagram generator method that handles its own errors
-        diagram_result = diagram_generator.generate_diagram(diagram_type)
+        diagram_result = await asyncio.to_thread(diagram_generator.generate_diagram, diagram_type)
         return diagram_result
             
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error generating entity diagram: {e}", exc_info=True)
+        logger.error("Error generating entity diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An error occurred generating the diagram: {str(e)}"
         )
 
 @router.get("/diagrams/use-cases/{repo_name}", response_model=Dict[str, Any])
-async def get_use_case_diagram(repo_name: str):
+async def get_use_case_diagram(repo_name: str, request: Request, response: Response):
     """
     Generates a use case diagram from parsed Gherkin features.
     """
     try:
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Create diagram renderer
-        renderer = DiagramRenderer(repo_path)
+        # Reuse the renderer (and its parsed data) for this revision of the clone
+        renderer = _renderer(repo_path, version)
         
         # Generate use case diagram
-        result = renderer.generate_diagram("use-case")
+        result = await asyncio.to_thread(renderer.generate_diagram, "use-case")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating use case diagram: {e}", exc_info=True)
+        logger.error("Unexpected error generating use case diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/diagrams/comprehensive-use-cases/{repo_name}", response_model=Dict[str, Any])
-async def get_comprehensive_use_case_diagram(repo_name: str):
+async def get_comprehensive_use_case_diagram(repo_name: str, request: Request, response: Response):
     """
     Generates a comprehensive use case diagram showing controllers, endpoints, and actors.
     """
     try:
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Create diagram renderer
-        renderer = DiagramRenderer(repo_path)
+        # Reuse the renderer (and its parsed data) for this revision of the clone
+        renderer = _renderer(repo_path, version)
         
         # Generate comprehensive use case diagram
-        result = renderer.generate_diagram("comprehensive-use-case")
+        result = await asyncio.to_thread(renderer.generate_diagram, "comprehensive-use-case")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating comprehensive use case diagram: {e}", exc_info=True)
+        logger.error("Unexpected error generating comprehensive use case diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/diagrams/interaction/{repo_name}", response_model=Dict[str, Any])
-async def get_interaction_diagram(repo_name: str):
+async def get_interaction_diagram(repo_name: str, request: Request, response: Response):
     """
     Generates an interaction diagram showing method calls between components.
     """
     try:
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Create diagram renderer
-        renderer = DiagramRenderer(repo_path)
+        # Reuse the renderer (and its parsed data) for this revision of the clone
+        renderer = _renderer(repo_path, version)
         
         # Generate interaction diagram
-        result = renderer.generate_diagram("interaction")
+        result = await asyncio.to_thread(renderer.generate_diagram, "interaction")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating interaction diagram: {e}", exc_info=True)
+        logger.error("Unexpected error generating interaction diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/diagrams/comprehensive-interaction/{repo_name}", response_model=Dict[str, Any])
-async def get_comprehensive_interaction_diagram(repo_name: str):
+async def get_comprehensive_interaction_diagram(repo_name: str, request: Request, response: Response):
     """
     Generates a comprehensive interaction diagram showing the full system architecture.
     """
     try:
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Create diagram renderer
-        renderer = DiagramRenderer(repo_path)
+        # Reuse the renderer (and its parsed data) for this revision of the clone
+        renderer = _renderer(repo_path, version)
         
         # Generate comprehensive interaction diagram
-        result = renderer.generate_diagram("comprehensive-interaction")
+        result = await asyncio.to_thread(renderer.generate_diagram, "comprehensive-interaction")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating comprehensive interaction diagram: {e}", exc_info=True)
+        logger.error("Unexpected error generating comprehensive interaction diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/diagrams/class/{repo_name}", response_model=Dict[str, Any])
-async def get_class_diagram(repo_name: str):
+async def get_class_diagram(repo_name: str, request: Request, response: Response):
     """
     Generates a class diagram showing entities, repositories, and services.
     """
     try:
         repo_path = _get_repo_path(repo_name)
+        version = _repo_version(repo_path)
+        not_modified = _check_not_modified(request, response, version)
+        if not_modified:
+            return not_modified
         
-        # Create diagram renderer
-        renderer = DiagramRenderer(repo_path)
+        # Reuse the renderer (and its parsed data) for this revision of the clone
+        renderer = _renderer(repo_path, version)
         
         # Generate class diagram
-        result = renderer.generate_diagram("class")
+        result = await asyncio.to_thread(renderer.generate_diagram, "class")
         
         return result
     except HTTPException:
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating class diagram: {e}", exc_info=True)
+        logger.error("Unexpected error generating class diagram: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
+# File holding the number of times a clone was invalidated through the API.
+# It is part of the clone's version, so edits made in place without a new
+# commit change the ETag, and it lives in the clone so restarts keep it.
+_INVALIDATION_MARKER = "codedocgen-invalidations"
+
+def _invalidation_marker_path(repo_path: str) -> str:
+    """Where a clone's invalidation count is kept: inside .git when it is a checkout."""
+    git_dir = os.path.join(repo_path, ".git")
+    if os.path.isdir(git_dir):
+        return os.path.join(git_dir, _INVALIDATION_MARKER)
+    return os.path.join(repo_path, f".{_INVALIDATION_MARKER}")
+
+def _invalidation_count(repo_path: str) -> int:
+    """Return how many times a clone was invalidated, 0 when it never was."""
+    try:
+        with open(_invalidation_marker_path(repo_path), encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+def _bump_invalidation_count(repo_path: str) -> None:
+    """Increment a clone's invalidation count, replacing the file atomically."""
+    marker_path = _invalidation_marker_path(repo_path)
+    temp_path = f"{marker_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(str(_invalidation_count(repo_path) + 1))
+    os.replace(temp_path, marker_path)
+
+def _repo_version(repo_path: str) -> str:
+    """
+    Identify the checked-out revision of a clone for use in cache keys and ETags.
+    
+    Reads the HEAD commit straight from .git rather than spawning git, and
+    falls back to the directory mtime when the clone is not a git checkout.
+    Clones invalidated through the API get their invalidation count appended.
+    """
+    revision = _head_revision(repo_path)
+    invalidations = _invalidation_count(repo_path)
+    return f"{revision}.{invalidations}" if invalidations else revision
+
+def _head_revision(repo_path: str) -> str:
+    """Return the HEAD commit of a clone, or its directory mtime when it is not a git checkout."""
+    git_dir = os.path.join(repo_path, ".git")
+    try:
+        with open(os.path.join(git_dir, "HEAD"), encoding="utf-8") as f:
+            head = f.read().strip()
+        if not head.startswith("ref: "):
+            # Detached HEAD holds the commit sha itself
+            return head
+        ref = head[len("ref: "):]
+        ref_path = os.path.join(git_dir, ref)
+        if os.path.isfile(ref_path):
+            with open(ref_path, encoding="utf-8") as f:
+                return f.read().strip()
+        with open(os.path.join(git_dir, "packed-refs"), encoding="utf-8") as f:
+            for line in f:
+                sha, _, name = line.rstrip("\n").partition(" ")
+                if name == ref:
+                    return sha
+    except OSError:
+        pass
+    return str(os.stat(repo_path).st_mtime_ns)
+
+def _check_not_modified(request: Request, response: Response, version: str) -> Optional[Response]:
+    """
+    Validate the client's cached copy of a response derived from a clone.
+    
+    The ETag is the clone's version salted with _RESPONSE_FORMAT_VERSION. When
+    If-None-Match already names it an empty 304 response is returned; otherwise
+    the ETag and Cache-Control headers are set on response and None is returned.
+    """
+    etag = f'"{_RESPONSE_FORMAT_VERSION}-{version}"'
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL}
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if etag in client_tags or "*" in client_tags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    response.headers.update(headers)
+    return None
+
+@functools.lru_cache(maxsize=64)
+def _parsed_architecture(repo_path: str, version_key: str) -> Dict[str, Any]:
+    """
+    Parse a repository's endpoints, once per checked-out revision.
+    
+    EndpointParser keeps per-parse state on the instance, so concurrent
+    requests running in worker threads must not share one. The returned
+    data is shared between requests and must not be modified by callers.
+    """
+    return EndpointParser().parse_endpoints(repo_path)
+
+@functools.lru_cache(maxsize=32)
+def _entity_parser(repo_path: str, version_key: str) -> EntityParser:
+    """
+    Share one EntityParser per checked-out revision of a clone.
+    
+    The parser memoizes its parse, so the entity, entity diagram and schema
+    endpoints parse a revision only once between them.
+    """
+    return EntityParser(repo_path)
+
+@functools.lru_cache(maxsize=32)
+def _renderer(repo_path: str, version_key: str) -> DiagramRenderer:
+    """
+    Share one DiagramRenderer per checked-out revision of a clone.
+    
+    The renderer loads the revision's endpoints from _parsed_architecture on
+    its first diagram and reuses them for every other diagram type.
+    """
+    return DiagramRenderer(repo_path, functools.partial(_parsed_architecture, repo_path, version_key))
+
+@functools.lru_cache(maxsize=64)
+def _analyzed_flows(repo_path: str, version_key: str) -> List[Dict[str, Any]]:
+    """
+    Analyze a repository's endpoint flows, once per checked-out revision.
+    
+    Like EndpointParser, FlowAnalyzer keeps per-analysis state on the instance.
+    The endpoints come from the shared parse of the same revision rather than
+    a second parse. The returned flows are shared between requests and must
+    not be modified.
+    """
+    return FlowAnalyzer().analyze_flows(repo_path, _parsed_architecture(repo_path, version_key))
+
+@functools.lru_cache(maxsize=64)
+def _analyzed_project(repo_path: str, version_key: str) -> Dict[str, Any]:
+    """Analyze a repository's project type, once per checked-out revision."""
+    return project_analyzer.analyze_project(repo_path)
+
+@functools.lru_cache(maxsize=512)
+def _resolve_repo_dir(repo_name: str, base_dir: str, base_dir_mtime_ns: int) -> Optional[str]:
+    """
+    Find the newest clone directory of a repository under base_dir.
+    
+    base_dir_mtime_ns is only part of the cache key: cloning, renaming or
+    removing a clone changes the mtime of base_dir, which invalidates the entry.
+    """
+    prefix = f"{repo_name}_"
+    with os.scandir(base_dir) as entries:
+        # Match on the name first so only candidate clones cost a stat call;
+        # hidden entries and symlinks are never clones
+        possible_dirs = [entry for entry in entries
+                         if (entry.name == repo_name or entry.name.startswith(prefix)) and
+                            not entry.name.startswith(".") and
+                            entry.is_dir(follow_symlinks=False)]
+    
+    if not possible_dirs:
+        return None
+    
+    # Get the latest directory by modification time (newest clone)
+    latest_dir = max(possible_dirs, key=lambda entry: entry.stat().st_mtime_ns)
+    
+    return latest_dir.path
+
 # Helper function to get repo path
 def _get_repo_path(repo_name: str):
     base_dir = repo_service.base_dir
-    possible_dirs = [d for d in os.listdir(base_dir) 
-                    if os.path.isdir(os.path.join(base_dir, d)) and 
-                        (d.startswith(f"{repo_name}_") or d == repo_name)]
+    try:
+        repo_path = _resolve_repo_dir(repo_name, base_dir, os.stat(base_dir).st_mtime_ns)
+    except FileNotFoundError:
+        repo_path = None
     
-    if not possible_dirs:
-        logger.error(f"Repository not found: {repo_name}")
+    if not repo_path:
+        logger.error("Repository not found: %s", repo_name)
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Repository not found: {repo_name}"
         )
     
-    # Get the latest directory by modification time (newest clone)
-    repo_dirs_with_mtime = [(d, os.path.getmtime(os.path.join(base_dir, d))) 
-                           for d in possible_dirs]
-    repo_dirs_with_mtime.sort(key=lambda x: x[1], reverse=True)
-    latest_dir = repo_dirs_with_mtime[0][0]
+    return repo_path
+
+def _full_flow(flow: Dict[str, Any]) -> Dict[str, Any]:
+    """Developers and architects see everything."""
+    return flow
+
+def _product_owner_flow(flow: Dict[str, Any]) -> Dict[str, Any]:
+    """Product owners just see a simplified version (controller -> service) without details."""
+    return {
+        "controller": flow["controller"],
+        "endpoint": flow["endpoint"],
+        "http_method": flow["http_method"],
+        # Include only first level of flow (controller -> service), with no detailed calls
+        "flow": [
+            {
+                "class_name": entry["class_name"],
+                "class_type": entry["class_type"],
+                "method": entry["method"],
+                "parameters": entry.get("parameters", []),
+                "return_type": entry.get("return_type", "void"),
+                "calls": []
+            }
+            for entry in flow["flow"]
+            if entry["class_type"] in _PRODUCT_OWNER_CLASS_TYPES
+        ]
+    }
+
+def _qa_flow(flow: Dict[str, Any]) -> Dict[str, Any]:
+    """QA sees the full flow but without implementation details."""
+    # New entry dicts, since the flows are shared with the analysis cache.
+    # Required fields are simplified rather than removed.
+    return {
+        **flow,
+        "flow": [{**entry, "parameters": [], "return_type": "simplified"} for entry in flow["flow"]]
+    }
+
+# Class types shown in a product owner's flows
+_PRODUCT_OWNER_CLASS_TYPES = frozenset({"controller", "service"})
+
+# How each role sees an endpoint flow; flows are omitted for unknown roles
+_ROLE_FLOW_VIEWS = {
+    "developer": _full_flow,
+    "architect": _full_flow,
+    "product_owner": _product_owner_flow,
+    "qa": _qa_flow
+}
+
+def _validated_flows(flows: List[Dict[str, Any]]) -> List[EndpointFlow]:
+    """Validate every flow as response_model would, before any of the response is sent."""
+    return [EndpointFlow.parse_obj(flow) for flow in flows]
+
+def _stream_flow_response(message: str, flows: List[EndpointFlow]) -> Iterator[bytes]:
+    """
+    Encode a successful FlowResponse body one flow at a time.
     
-    return os.path.join(base_dir, latest_dir)
+    The flows are already validated, so the stream cannot fail part way
+    through; its JSON is the same as the non-streamed response while only one
+    flow is encoded at a time.
+    """
+    yield orjson.dumps({"status": "success", "message": message})[:-1] + b',"flows":['
+    for index, flow in enumerate(flows):
+        yield (b"," if index else b"") + orjson.dumps(flow.dict())
+    yield b'],"error_details":null}'
 
 class ConfluencePublishRequest(BaseModel):
     """Request model for publishing to Confluence."""
@@ -742,17 +901,16 @@ async def publish_to_confluence(request: ConfluencePublishRequest):
         repo_path = _get_repo_path(repo_name)
         
         # Validate selected sections
-        valid_sections = ["api_docs", "features", "diagrams", "flows"]
-        for section in request.selected_sections:
-            if section not in valid_sections:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid section: {section}. Valid options are: {', '.join(valid_sections)}"
-                )
+        invalid_sections = set(request.selected_sections) - _VALID_SECTIONS
+        if invalid_sections:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid section(s): {', '.join(sorted(invalid_sections))}. Valid options are: {', '.join(sorted(_VALID_SECTIONS))}"
+            )
         
         # Build the documentation payload
         payload_builder = PublishPayloadBuilder(repo_path, repo_name)
-        sections_content = payload_builder.build_documentation_payload(request.selected_sections)
+        sections_content = await asyncio.to_thread(payload_builder.build_documentation_payload, request.selected_sections)
         
         # Convert to Confluence format
         converter = MarkdownToConfluenceConverter()
@@ -766,7 +924,8 @@ async def publish_to_confluence(request: ConfluencePublishRequest):
         )
         
         # Publish content
-        result = publisher.publish_content(
+        result = await asyncio.to_thread(
+            publisher.publish_content,
             space_key=request.space_key,
             title=request.page_title,
             content=content,
@@ -797,32 +956,35 @@ async def publish_to_confluence(request: ConfluencePublishRequest):
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error publishing to Confluence: {e}", exc_info=True)
+        logger.error("Unexpected error publishing to Confluence: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
         )
 
 @router.get("/flows/{repo_name}", response_model=FlowResponse, status_code=status.HTTP_200_OK)
-async def get_endpoint_flows(repo_name: str, role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)")):
+async def get_endpoint_flows(
+    repo_name: str,
+    role: Optional[str] = Query(None, description="User role (developer, architect, product_owner, qa)"),
+    layout: str = Query("tree", description="Call layout: 'tree' for nested calls, 'flat' for a call_graph node table")
+):
     """
     Analyzes method call flows starting from controller endpoints, following through services to repositories.
     Optionally filters flow data based on the specified user role.
+    With layout=flat, each flow entry's nested calls are replaced by a flat call_graph.
     """
     try:
         # Get repository path
         repo_path = _get_repo_path(repo_name)
-        if not repo_path:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
         
-        logger.info(f"Analyzing endpoint flows in repository: {repo_name} using path {repo_path}")
+        logger.info("Analyzing endpoint flows in repository: %s using path %s", repo_name, repo_path)
         
-        # First check if this is a Spring Boot project
-        project_info = project_analyzer.analyze_project(repo_path)
+        # Check if this is a Spring Boot project and get all endpoints; the two are independent
+        version = _repo_version(repo_path)
+        project_info, architecture_data = await asyncio.gather(
+            asyncio.to_thread(_analyzed_project, repo_path, version),
+            asyncio.to_thread(_parsed_architecture, repo_path, version)
+        )
         
         if project_info["status"] == "error":
             return {
@@ -833,10 +995,7 @@ async def get_endpoint_flows(repo_name: str, role: Optional[str] = Query(None, d
         
         # Continue even if not Spring Boot, but log a warning
         if not project_info.get("is_spring_boot", False):
-            logger.warning(f"Repository {repo_name} is not identified as a Spring Boot project. Flow analysis may be unreliable.")
-        
-        # First get all endpoints
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+            logger.warning("Repository %s is not identified as a Spring Boot project. Flow analysis may be unreliable.", repo_name)
         
         # Check if architecture_data is a dictionary with endpoints key (new format)
         if isinstance(architecture_data, dict) and "endpoints" in architecture_data:
@@ -853,52 +1012,39 @@ async def get_endpoint_flows(repo_name: str, role: Optional[str] = Query(None, d
             }
         
         # Analyze flows for each endpoint
-        flows = flow_analyzer.analyze_flows(repo_path)
+        flows = await asyncio.to_thread(_analyzed_flows, repo_path, version)
         
         # Apply role-based filtering if a role is specified
         if role:
             # For flows, we might just want to filter out certain parts of the flow that are
             # not relevant for the role (like implementation details for product owners)
-            filtered_flows = []
-            for flow in flows:
-                if role == "developer" or role == "architect":
-                    # Developers and architects see everything
-                    filtered_flows.append(flow)
-                elif role == "product_owner":
-                    # Product owners just see a simplified version (controller -> service) without details
-                    simple_flow = {
-                        "controller": flow["controller"],
-                        "endpoint": flow["endpoint"],
-                        "http_method": flow["http_method"],
-                        "flow": []
-                    }
-                    # Include only first level of flow (controller -> service)
-                    for entry in flow["flow"]:
-                        if entry["class_type"] in ["controller", "service"]:
-                            simple_entry = {
-                                "class_name": entry["class_name"],
-                                "class_type": entry["class_type"],
-                                "method": entry["method"],
-                                "parameters": entry.get("parameters", []),
-                                "return_type": entry.get("return_type", "void"),
-                                "calls": []  # No detailed calls for product owners
-                            }
-                            simple_flow["flow"].append(simple_entry)
-                    filtered_flows.append(simple_flow)
-                elif role == "qa":
-                    # QA sees full flow but without implementation details
-                    qa_flow = flow.copy()
-                    for entry in qa_flow["flow"]:
-                        # Simplify rather than remove required fields
-                        entry["parameters"] = []  # Empty list instead of removing
-                        entry["return_type"] = "simplified"  # Simplified value instead of removing
-                    filtered_flows.append(qa_flow)
-            
-            flows = filtered_flows
+            flow_view = _ROLE_FLOW_VIEWS.get(role)
+            flows = [flow_view(flow) for flow in flows] if flow_view else []
+        
+        if layout == "flat":
+            flows = [
+                {
+                    **flow,
+                    "flow": [
+                        {**entry, "calls": None, "call_graph": FlowAnalyzer.build_call_graph(entry.get("calls"))}
+                        for entry in flow["flow"]
+                    ]
+                }
+                for flow in flows
+            ]
+        
+        message = f"Successfully analyzed flows for {len(flows)} endpoints" + (f" (filtered for {role} role)" if role else "")
+        
+        # Full-detail flows are the large responses, so stream their encoding flow
+        # by flow. They are validated first, so a flow that fails validation still
+        # gives a 500 instead of a truncated 200 body.
+        if layout != "flat" and (not role or _ROLE_FLOW_VIEWS.get(role) is _full_flow):
+            validated_flows = await asyncio.to_thread(_validated_flows, flows)
+            return StreamingResponse(_stream_flow_response(message, validated_flows), media_type="application/json")
         
         return {
             "status": "success",
-            "message": f"Successfully analyzed flows for {len(flows)} endpoints" + (f" (filtered for {role} role)" if role else ""),
+            "message": message,
             "flows": flows
         }
     
@@ -906,7 +1052,7 @@ async def get_endpoint_flows(repo_name: str, role: Optional[str] = Query(None, d
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error analyzing endpoint flows: {e}", exc_info=True)
+        logger.error("Unexpected error analyzing endpoint flows: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -920,18 +1066,16 @@ async def get_schema_overview(repo_name: str, role: Optional[str] = Query(None,
     try:
         # Get repository path
         repo_path = _get_repo_path(repo_name)
-        if not repo_path:
-            logger.error(f"Repository not found: {repo_name}")
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repository not found: {repo_name}"
-            )
         
-        logger.info(f"Generating schema overview for repository: {repo_name} using path {repo_path}")
+        logger.info("Generating schema overview for repository: %s using path %s", repo_name, repo_path)
         
-        # First get all entities
-        entity_parser_instance = EntityParser(repo_path)
-        entities = entity_parser_instance.parse_entities()
+        # Get all entities and all endpoints; the two parses are independent
+        version = _repo_version(repo_path)
+        entity_parser_instance = _entity_parser(repo_path, version)
+        entities, architecture_data = await asyncio.gather(
+            asyncio.to_thread(entity_parser_instance.parse_entities),
+            asyncio.to_thread(_parsed_architecture, repo_path, version)
+        )
         
         if not entities.get("entities"):
             return {
@@ -940,12 +1084,10 @@ async def get_schema_overview(repo_name: str, role: Optional[str] = Query(None,
                 "tables": {}
             }
         
-        # Get all endpoints
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
         endpoints = architecture_data.get("endpoints", [])
         
         # Map the schema
-        schema = schema_mapper.map_schema(repo_path, entities, endpoints)
+        schema = await asyncio.to_thread(schema_mapper.map_schema, repo_path, entities, endpoints)
         
         # Apply role-based filtering if a role is specified
         if role:
@@ -954,9 +1096,8 @@ async def get_schema_overview(repo_name: str, role: Optional[str] = Query(None,
                 # Simplify table names and relationships
                 simplified_tables = {}
                 for table_name, table_data in schema.get("tables", {}).items():
-                    business_name = table_data.get("entity", "").replace("Entity", "")
                     # Add spaces before capital letters, except the first letter
-                    business_name = ''.join([' ' + c if c.isupper() and i > 0 else c for i, c in enumerate(business_name)])
+                    business_name = _CAMEL_SPLIT.sub(' ', table_data.get("entity", "").replace("Entity", ""))
                     
                     simplified_tables[table_name] = {
                         "business_name": business_name.strip(),
@@ -977,8 +1118,11 @@ async def get_schema_overview(repo_name: str, role: Optional[str] = Query(None,
                 schema.pop("entities", None)
             elif role == "architect":
                 # Architects get the full schema but without field details
-                for entity_name, entity_data in schema.get("entities", {}).items():
-                    entity_data.pop("fields", None)
+                # (copied, since the entity data is shared with the parse cache)
+                schema["entities"] = {
+                    entity_name: {key: value for key, value in entity_data.items() if key != "fields"}
+                    for entity_name, entity_data in schema.get("entities", {}).items()
+                }
         
         return {
             "status": "success",
@@ -991,7 +1135,7 @@ async def get_schema_overview(repo_name: str, role: Optional[str] = Query(None,
         # Re-raise HTTP exceptions
         raise
     except Exception as e:
-        logger.error(f"Unexpected error generating schema overview: {e}", exc_info=True)
+        logger.error("Unexpected error generating schema overview: %s", e, exc_info=True)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An unexpected error occurred: {str(e)}"
@@ -1,14 +1,37 @@
+import hashlib
 import logging
-import requests
 import json
-import base64
-from typing import Dict, Optional, Any
+import orjson
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# (connect, read) timeout in seconds for every Confluence API call
+_REQUEST_TIMEOUT = (3.05, 30)
+
+# Pages published at once by publish_many; stays within the session's connection pool
+_PUBLISH_WORKERS = 6
+
 class ConfluencePublisher:
     """Class for publishing documentation to Confluence."""
     
+    # Page lookups shared by all publishers (one is created per publish request):
+    # (base_url, username, space_key, title) -> (ETag, (page ID, version)).
+    # Revalidating with the ETag lets Confluence answer 304 with an empty body.
+    _LOOKUP_CACHE_SIZE = 256
+    _lookup_cache: "OrderedDict[Tuple[str, str, str, str], Tuple[str, Tuple[str, int]]]" = OrderedDict()
+    _lookup_cache_lock = threading.Lock()
+    
+    # Pages this process published: (base_url, page ID, resulting version) ->
+    # (content digest, page data). If a page is still at the version our own
+    # update produced, its body is still the content we sent.
+    _PUBLISHED_CACHE_SIZE = 256
+    _published_cache: "OrderedDict[Tuple[str, str, int], Tuple[str, Dict[str, Any]]]" = OrderedDict()
+    _published_cache_lock = threading.Lock()
+    
     def __init__(self, base_url: str, username: str, api_token: str):
         """
         Initialize the Confluence Publisher.
@@ -18,42 +41,87 @@ class ConfluencePublisher:
             username: The username for Confluence (typically an email)
             api_token: The API token for authentication
         """
+        # requests and urllib3 are slow to import, so load them when a publisher is first created
+        import requests
+        from requests.adapters import HTTPAdapter
+        from requests.auth import HTTPBasicAuth
+        from urllib3.util.retry import Retry
+        
         self.base_url = base_url.rstrip('/')
         self.auth = (username, api_token)
         self.api_url = f"{self.base_url}/rest/api/content"
         
-    def _get_auth_header(self) -> Dict[str, str]:
-        """Create the authentication header for Confluence API."""
-        auth_str = f"{self.auth[0]}:{self.auth[1]}"
-        encoded = base64.b64encode(auth_str.encode('utf-8')).decode('utf-8')
-        return {
-            "Authorization": f"Basic {encoded}",
-            "Content-Type": "application/json"
-        }
+        # One pooled session per publisher, so each API call after the first
+        # reuses an open connection instead of a new TCP and TLS handshake
+        self.session = requests.Session()
+        self.session.auth = HTTPBasicAuth(username, api_token)
+        self.session.headers["Content-Type"] = "application/json"
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         
-    def page_exists(self, space_key: str, title: str) -> Optional[str]:
+    def page_exists(self, space_key: str, title: str) -> Optional[Tuple[str, int]]:
         """
         Check if a page with the given title exists in the specified space.
         
         Returns:
-            The page ID if found, None otherwise
+            Tuple of (page ID, current version number) if found, None otherwise
         """
         try:
             params = {
                 "spaceKey": space_key,
                 "title": title,
-                "expand": "version"
+                "expand": "version",
+                # Only the first match is used, so don't have Confluence send more
+                "limit": 1
             }
-            response = requests.get(
+            
+            cache_key = (self.base_url, self.auth[0], space_key, title)
+            with self._lookup_cache_lock:
+                cached = self._lookup_cache.get(cache_key)
+            headers = {"If-None-Match": cached[0]} if cached else None
+            
+            response = self.session.get(
                 self.api_url, 
                 params=params,
-                headers=self._get_auth_header()
+                headers=headers,
+                timeout=_REQUEST_TIMEOUT
             )
             
+            if response.status_code == 304 and cached:
+                with self._lookup_cache_lock:
+                    if cache_key in self._lookup_cache:
+                        self._lookup_cache.move_to_end(cache_key)
+                return cached[1]
+            
             if response.status_code == 200:
                 data = response.json()
                 if data.get("results") and len(data["results"]) > 0:
-                    return data["results"][0]["id"]
+                    page = data["results"][0]
+                    # The lookup expands the version, so no second request is needed for it
+                    page_info = (page["id"], page.get("version", {}).get("number", 0))
+                    
+                    etag = response.headers.get("ETag")
+                    if etag:
+                        with self._lookup_cache_lock:
+                            self._lookup_cache[cache_key] = (etag, page_info)
+                            self._lookup_cache.move_to_end(cache_key)
+                            if len(self._lookup_cache) > self._LOOKUP_CACHE_SIZE:
+                                self._lookup_cache.popitem(last=False)
+                    return page_info
+                
+                # The page is gone, so its cached lookup is too
+                with self._lookup_cache_lock:
+                    self._lookup_cache.pop(cache_key, None)
             
             return None
         except Exception as e:
@@ -90,10 +158,10 @@ class ConfluencePublisher:
             if parent_id:
                 page_data["ancestors"] = [{"id": parent_id}]
             
-            response = requests.post(
+            response = self.session.post(
                 self.api_url,
-                json=page_data,
-                headers=self._get_auth_header()
+                data=orjson.dumps(page_data),
+                timeout=_REQUEST_TIMEOUT
             )
             
             if response.status_code in (200, 201):
@@ -150,10 +218,10 @@ class ConfluencePublisher:
             if parent_id:
                 page_data["ancestors"] = [{"id": parent_id}]
             
-            response = requests.put(
+            response = self.session.put(
                 f"{self.api_url}/{page_id}",
-                json=page_data,
-                headers=self._get_auth_header()
+                data=orjson.dumps(page_data),
+                timeout=_REQUEST_TIMEOUT
             )
             
             if response.status_code == 200:
@@ -190,33 +258,85 @@ class ConfluencePublisher:
             Response data with status and details
         """
         try:
-            # Check if the page exists
-            page_id = self.page_exists(space_key, title)
-            
-            if page_id:
-                # Get the current version
-                response = requests.get(
-                    f"{self.api_url}/{page_id}?expand=version",
-                    headers=self._get_auth_header()
-                )
+            digest = self._content_digest(content, parent_id)
+            
+            # Check if the page exists, getting its current version along with its ID
+            existing_page = self.page_exists(space_key, title)
+            
+            if existing_page:
+                page_id, version = existing_page
                 
-                if response.status_code != 200:
+                # Skip the update when the page still holds exactly this content
+                with self._published_cache_lock:
+                    published = self._published_cache.get((self.base_url, page_id, version))
+                if published and published[0] == digest:
+                    logger.info(f"Content of page {page_id} is unchanged, skipping update")
                     return {
-                        "status": "error",
-                        "message": f"Failed to get page version: {response.status_code}"
+                        "status": "success",
+                        "message": "Page content unchanged, update skipped",
+                        "data": published[1]
                     }
-                    
-                version = response.json().get("version", {}).get("number", 0)
                 
                 # Update the page
-                return self.update_page(page_id, title, content, version, parent_id)
+                result = self.update_page(page_id, title, content, version, parent_id)
             else:
                 # Create a new page
-                return self.create_page(space_key, title, content, parent_id)
+                result = self.create_page(space_key, title, content, parent_id)
+            
+            if result.get("status") == "success":
+                # The cached lookup names the version before this write; a 304
+                # for it would make the next update send a stale version
+                self._forget_lookup(space_key, title)
+                self._remember_published(result.get("data") or {}, digest)
+            return result
                 
         except Exception as e:
             logger.error(f"Error publishing content: {str(e)}")
             return {
                 "status": "error",
                 "message": f"Exception: {str(e)}"
-            } 
\ No newline at end of file
+            }
+    
+    @staticmethod
+    def _content_digest(content: str, parent_id: Optional[str]) -> str:
+        """Digest of what an update would write: the page body and its parent."""
+        return hashlib.sha256(f"{parent_id or ''}\0{content}".encode("utf-8")).hexdigest()
+    
+    def _forget_lookup(self, space_key: str, title: str) -> None:
+        """Drop the cached lookup of a page so the next page_exists fetches it again."""
+        with self._lookup_cache_lock:
+            self._lookup_cache.pop((self.base_url, self.auth[0], space_key, title), None)
+    
+    def _remember_published(self, page_data: Dict[str, Any], digest: str) -> None:
+        """Record the version a successful create or update left the page at."""
+        page_id = page_data.get("id")
+        version = page_data.get("version", {}).get("number")
+        if page_id is None or version is None:
+            return
+        
+        # Only what callers read from a publish result is kept
+        summary = {"id": page_id, "version": {"number": version}, "_links": page_data.get("_links", {})}
+        with self._published_cache_lock:
+            self._published_cache[(self.base_url, page_id, version)] = (digest, summary)
+            self._published_cache.move_to_end((self.base_url, page_id, version))
+            if len(self._published_cache) > self._PUBLISHED_CACHE_SIZE:
+                self._published_cache.popitem(last=False)
+    
+    def publish_many(self, pages: List[Dict[str, Any]], max_workers: int = _PUBLISH_WORKERS) -> List[Dict[str, Any]]:
+        """
+        Publish several pages concurrently, overlapping their API roundtrips.
+        
+        Args:
+            pages: Keyword arguments for publish_content, one dictionary per page
+                (space_key, title, content and optionally parent_id)
+            max_workers: Maximum number of pages published at the same time
+            
+        Returns:
+            The publish_content result for each page, in the order given
+        """
+        if not pages:
+            return []
+        
+        # All workers share this publisher's pooled session and its retry policy
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(pages))) as executor:
+            return list(executor.map(lambda page: self.publish_content(**page), pages))
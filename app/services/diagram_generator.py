@@ -1,60 +1,99 @@
+import base64
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import os
+import re
 import tempfile
+import zlib
+from types import MappingProxyType
+from .entity_parser import EntityParser
 
 logger = logging.getLogger(__name__)
 
+# PlantUML server that diagram URLs point at. Point this at a self-hosted
+# server (e.g. the plantuml/plantuml-server image) to keep diagram sources
+# private and image loads on the local network.
+PLANTUML_SERVER_URL = os.getenv("PLANTUML_SERVER_URL", "http://www.plantuml.com/plantuml/img/")
+
+# Maps the base64 alphabet onto the one PlantUML uses in diagram URLs
+_PLANTUML_ALPHABET = bytes.maketrans(
+    b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/",
+    b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz-_"
+)
+
+def plantuml_url(puml_source: str) -> str:
+    """
+    Build the PLANTUML_SERVER_URL address that renders puml_source.
+    
+    The source is raw-deflated and base64-encoded in PlantUML's alphabet.
+    PlantUML encodes a trailing partial group as if zero-padded rather than
+    with "=", so the deflated bytes are padded to a multiple of 3 first.
+    """
+    compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(puml_source.encode("utf-8")) + compressor.flush()
+    deflated += b"\0" * (-len(deflated) % 3)
+    return PLANTUML_SERVER_URL + base64.b64encode(deflated).translate(_PLANTUML_ALPHABET).decode("ascii")
+
+# Package prefixes dropped from field types, matched in one scan of the type
+_JAVA_PACKAGE_PREFIX_RE = re.compile(r"java\.(?:util|lang)\.")
+
+# PlantUML class diagram multiplicities for JPA relationship types
+_CLASS_RELATIONSHIP_ARROWS = MappingProxyType({
+    "OneToMany": '"1" -- "*"',
+    "ManyToOne": '"*" -- "1"',
+    "OneToOne": '"1" -- "1"',
+    "ManyToMany": '"*" -- "*"'
+})
+
+# PlantUML ER diagram crow's foot connectors for JPA relationship types
+_ER_RELATIONSHIP_ARROWS = MappingProxyType({
+    "OneToMany": "||--o{",
+    "ManyToOne": "}o--||",
+    "OneToOne": "||--||",
+    "ManyToMany": "}o--o{"
+})
+
 class PlantUMLGenerator:
     """Generate PlantUML diagrams from parsed entities."""
     
-    def __init__(self, repo_path: str):
+    def __init__(self, repo_path: str, entity_parser: Optional[EntityParser] = None):
         self.repo_path = repo_path
+        # Parser for repo_path; sharing one reuses its already parsed entities
+        self.entity_parser = entity_parser or EntityParser(repo_path)
     
     @staticmethod
     def generate_class_diagram(entities_data: Dict[str, Any]) -> str:
         """Generate a PlantUML class diagram from entity data."""
         
         puml = ["@startuml", "skinparam classAttributeIconSize 0"]
+        # Relationships are collected in the same pass and emitted after all classes are defined
+        relationships = []
         
         # Process all entities - entities_data structure is {entities: {entity_name: entity_data}}
         for entity_name, entity in entities_data.get("entities", {}).items():
-            # Add class definition
-            puml.append(f"class {entity_name} {{")
+            # Add class definition with its fields as one block
+            fields = "".join(
+                f"\n  {field['name']}: {_JAVA_PACKAGE_PREFIX_RE.sub('', field['type'])}"
+                for field in entity.get("fields", ())
+            )
+            puml.append(f"class {entity_name} {{{fields}\n}}")
             
-            # Add fields
-            for field in entity.get("fields", []):
-                field_type = field["type"].replace("java.util.", "").replace("java.lang.", "")
-                puml.append(f"  {field['name']}: {field_type}")
-            
-            puml.append("}")
-            
-        # Process relationships after all classes are defined
-        for entity_name, entity in entities_data.get("entities", {}).items():
             # Add relationships
-            for relationship in entity.get("relationships", []):
+            for relationship in entity.get("relationships", ()):
                 target_entity = relationship["target"]
                 rel_type = relationship["type"]
                 
                 # Map JPA relationship types to PlantUML syntax
-                if rel_type == "OneToMany":
-                    arrow = f"{entity_name} \"1\" -- \"*\" {target_entity}"
-                elif rel_type == "ManyToOne":
-                    arrow = f"{entity_name} \"*\" -- \"1\" {target_entity}"
-                elif rel_type == "OneToOne":
-                    arrow = f"{entity_name} \"1\" -- \"1\" {target_entity}"
-                elif rel_type == "ManyToMany":
-                    arrow = f"{entity_name} \"*\" -- \"*\" {target_entity}"
-                else:
-                    arrow = f"{entity_name} -- {target_entity}"
+                arrow = f"{entity_name} {_CLASS_RELATIONSHIP_ARROWS.get(rel_type, '--')} {target_entity}"
                 
                 # Add relationship label if needed
                 field_name = relationship.get("field")
                 if field_name:
                     arrow += f" : {field_name}"
                 
-                puml.append(arrow)
+                relationships.append(arrow)
         
+        puml.extend(relationships)
         puml.append("@enduml")
         return "\n".join(puml)
     
@@ -63,6 +102,8 @@ class PlantUMLGenerator:
         """Generate a PlantUML ER diagram from entity data."""
         
         puml = ["@startuml", "!define table(x) entity x << (T,#FFAAAA) >>"]
+        # Relationships are collected in the same pass and emitted after all tables
+        relationships = []
         
         # Process all entities - entities_data structure is {entities: {entity_name: entity_data}}
         for entity_name, entity in entities_data.get("entities", {}).items():
@@ -73,39 +114,27 @@ class PlantUMLGenerator:
             puml.append("  *id : Long <<PK>>")
             
             # Add fields
-            for field in entity.get("fields", []):
+            for field in entity.get("fields", ()):
                 if field["name"] != "id" and not field.get("is_relationship", False):
-                    field_type = field["type"].replace("java.util.", "").replace("java.lang.", "")
-                    puml.append(f"  {field['name']}: {field_type}")
+                    puml.append(f"  {field['name']}: {_JAVA_PACKAGE_PREFIX_RE.sub('', field['type'])}")
             
             puml.append("}")
             
-        # Process relationships
-        for entity_name, entity in entities_data.get("entities", {}).items():
             # Add relationships
-            for relationship in entity.get("relationships", []):
-                target_entity = relationship["target"]
-                rel_type = relationship["type"]
-                
-                if rel_type == "OneToMany":
-                    puml.append(f"{entity_name} ||--o{{ {target_entity}")
-                elif rel_type == "ManyToOne":
-                    puml.append(f"{entity_name} }}o--|| {target_entity}")
-                elif rel_type == "OneToOne":
-                    puml.append(f"{entity_name} ||--|| {target_entity}")
-                elif rel_type == "ManyToMany":
-                    puml.append(f"{entity_name} }}o--o{{ {target_entity}")
-                
+            for relationship in entity.get("relationships", ()):
+                # Other relationship types have no ER notation and are left out
+                arrow = _ER_RELATIONSHIP_ARROWS.get(relationship["type"])
+                if arrow:
+                    relationships.append(f"{entity_name} {arrow} {relationship['target']}")
+        
+        puml.extend(relationships)
         puml.append("@enduml")
         return "\n".join(puml)
         
     def generate_puml_source(self, diagram_type: str = "class") -> str:
         """Generate PlantUML source code based on entity data."""
-        from ..services.entity_parser import EntityParser
-        
         # Parse entities
-        parser = EntityParser(self.repo_path)
-        entities_data = parser.parse_entities()
+        entities_data = self.entity_parser.parse_entities()
         
         # Generate diagram source based on type
         if diagram_type == "er":
@@ -118,14 +147,8 @@ class PlantUMLGenerator:
         puml_source = self.generate_puml_source(diagram_type)
         
         try:
-            # Try to import plantuml (will fail if not installed)
-            import plantuml
-            
-            # Create a PlantUML server instance
-            server = plantuml.PlantUML(url='http://www.plantuml.com/plantuml/img/')
-            
-            # Generate the diagram
-            diagram_url = server.get_url(puml_source)
+            # Encode the source into a PlantUML server URL
+            diagram_url = plantuml_url(puml_source)
             
             return {
                 "status": "success",
@@ -134,15 +157,6 @@ class PlantUMLGenerator:
                 "diagram_url": diagram_url
             }
             
-        except ImportError as e:
-            # Handle missing plantuml package
-            logger.warning(f"PlantUML package not installed: {str(e)}")
-            return {
-                "status": "warning",
-                "message": f"PlantUML package not installed: {str(e)}. Install with: pip install plantuml six",
-                "puml_source": puml_source,
-                "diagram_url": None
-            }
         except Exception as e:
             # Handle other errors
             logger.error(f"Error generating diagram: {str(e)}")
@@ -1,85 +1,307 @@
+import io
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional, TextIO, Tuple
 import os
 import re
+import threading
+from .diagram_generator import plantuml_url
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on the relationships drawn in a comprehensive use-case diagram.
+# Larger diagrams take minutes to build and PlantUML cannot render them anyway.
+_DEFAULT_DIAGRAM_MAX_EDGES = 20000
+try:
+    DIAGRAM_MAX_EDGES = int(os.getenv("DIAGRAM_MAX_EDGES", _DEFAULT_DIAGRAM_MAX_EDGES))
+except ValueError:
+    DIAGRAM_MAX_EDGES = 0
+if DIAGRAM_MAX_EDGES < 1:
+    logger.warning(f"Ignoring invalid DIAGRAM_MAX_EDGES={os.getenv('DIAGRAM_MAX_EDGES')!r}, using {_DEFAULT_DIAGRAM_MAX_EDGES}")
+    DIAGRAM_MAX_EDGES = _DEFAULT_DIAGRAM_MAX_EDGES
+
+class _EdgeLimitReached(Exception):
+    """Raised once a diagram has drawn DIAGRAM_MAX_EDGES relationships."""
+
+# Regular expressions used per scenario or endpoint, compiled once per process
+_ACTOR_RE = re.compile(r"^([A-Za-z]+)\s+(can|should|must|will)\s+")
+_SANITIZE_RE = re.compile(r'[^A-Za-z0-9_]')
+_SERVICE_RE = re.compile(r'(\w+)Service\.')
+
+# Endpoint methods that are run by the system rather than a client
+_SYSTEM_METHOD_RE = re.compile(r'schedule|batch|job')
+
+# Domains the comprehensive interaction diagram groups endpoints into, by
+# keywords in their path or method name
+_DOMAIN_KEYWORDS = {
+    "Account Management": ["account", "customer", "card"],
+    "Transaction Processing": ["transaction", "deposit", "withdraw", "transfer"],
+    "Branch Operations": ["branch", "employee"],
+    "Customer Service": ["issue", "complaint", "pending-issues", "issue-fix"],
+    "Loan Services": ["loan", "payment-loan", "approve-loan", "bank-loan", "p2p-loan"],
+}
+_KEYWORD_DOMAINS = {keyword: domain for domain, keywords in _DOMAIN_KEYWORDS.items() for keyword in keywords}
+# Matches at every position (the lookahead consumes nothing), so overlapping
+# keywords from different domains are all found in one scan
+_DOMAIN_KEYWORD_RE = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in sorted(_KEYWORD_DOMAINS, key=len, reverse=True)) + "))"
+)
+
+# Repository operation a service method uses in the use-case diagram, by the
+# verb its name starts with; other methods are assumed to find
+_REPO_OPERATIONS = {
+    "get": "find", "find": "find",
+    "save": "save", "create": "save",
+    "update": "update",
+    "delete": "delete", "remove": "delete",
+}
+# Operations drawn for every repository in the use-case diagram, and the lines
+# declaring them and connecting them to an entity, filled in per repository
+_REPO_USE_CASES = ("save", "find", "update", "delete")
+_REPO_USE_CASE_LINES = "".join(f'      usecase "{operation}" as {{repo}}_{operation}\n' for operation in _REPO_USE_CASES)
+_REPO_ENTITY_EDGE_LINES = "".join(f"{{repo}}_{operation} ..> Entity_{{entity}} : <<accesses>>\n" for operation in _REPO_USE_CASES)
+
+# Repository method a service method calls in the interaction diagram; query
+# methods call a repository method of the same name
+_QUERY_PREFIXES = frozenset({"get", "find"})
+_REPO_CALLS = {
+    "create": "save", "add": "save",
+    "update": "update",
+    "delete": "delete", "remove": "delete",
+}
+# None of these verbs starts with another, so a name starts with at most one
+_METHOD_PREFIXES = frozenset(_REPO_OPERATIONS) | _QUERY_PREFIXES | frozenset(_REPO_CALLS)
+_METHOD_PREFIX_LENGTHS = tuple(sorted({len(prefix) for prefix in _METHOD_PREFIXES}))
+
+def _method_prefix(method_name: str) -> Optional[str]:
+    """Return the verb from _METHOD_PREFIXES that a method name starts with, if any."""
+    for length in _METHOD_PREFIX_LENGTHS:
+        prefix = method_name[:length]
+        if prefix in _METHOD_PREFIXES:
+            return prefix
+    return None
+
+# Maps every ASCII character _SANITIZE_RE would replace to "_"
+_SANITIZE_TABLE = str.maketrans({c: "_" for c in map(chr, range(128)) if not (c.isalnum() or c == "_")})
+
+# Fixed opening lines of the interaction and class diagrams, and the class
+# diagram's legend and closing line
+_INTERACTION_DIAGRAM_HEADER = (
+    "@startuml\n"
+    "skinparam sequenceArrowThickness 2\n"
+    "skinparam roundcorner 5\n"
+)
+
+_COMPREHENSIVE_INTERACTION_DIAGRAM_HEADER = (
+    "@startuml\n"
+    "skinparam sequenceArrowThickness 2\n"
+    "skinparam roundcorner 5\n"
+    "skinparam maxMessageSize 200\n"
+    "skinparam sequenceGroupBorderColor #888888\n"
+    "\n"
+)
+
+_CLASS_DIAGRAM_HEADER = (
+    "@startuml\n"
+    "skinparam classAttributeIconSize 0\n"
+    "skinparam classFontSize 12\n"
+    "skinparam classFontName Arial\n"
+    "skinparam classBackgroundColor LightCyan\n"
+    "skinparam stereotypeCBackgroundColor Yellow\n"
+    "skinparam packageBackgroundColor WhiteSmoke\n"
+    "skinparam arrowColor Navy\n"
+    "skinparam arrowThickness 1.5\n"
+    "skinparam linetype ortho\n"
+    "\n"
+)
+
+_CLASS_DIAGRAM_FOOTER = (
+    "legend right\n"
+    "  Entity: Database entity/model class\n"
+    "  Repository: Data access interface\n"
+    "  Service: Business logic component\n"
+    "  Controller: REST endpoint handler\n"
+    "  \n"
+    "  Relationship types:\n"
+    "  --o : Entity contains/references another entity\n"
+    "  ..> : Repository manages an entity\n"
+    "  --> : Service uses repository / Controller calls service\n"
+    "endlegend\n"
+    "@enduml"
+)
+
+
+class _SafeNames(dict):
+    """Component names with dots replaced for use in PlantUML ids, computed once per name."""
+    
+    def __missing__(self, name: str) -> str:
+        safe_name = self[name] = name.replace('.', '_')
+        return safe_name
+
+class _UseCaseIds(dict):
+    """PlantUML ids of component operations, keyed by (component name, operation), built once per pair."""
+    
+    def __init__(self, safe_names: _SafeNames):
+        super().__init__()
+        self.safe_names = safe_names
+    
+    def __missing__(self, key: Tuple[str, str]) -> str:
+        component, operation = key
+        use_case_id = self[key] = f"{self.safe_names[component]}_{operation}"
+        return use_case_id
+
 class DiagramRenderer:
     """Renders various types of diagrams including use-case and interaction diagrams."""
     
-    def __init__(self, repo_path: str):
+    # Every diagram type generate_diagram supports
+    DIAGRAM_TYPES = (
+        "use-case",
+        "comprehensive-use-case",
+        "interaction",
+        "comprehensive-interaction",
+        "class"
+    )
+    
+    def __init__(self, repo_path: str, load_endpoint_data: Optional[Callable[[], Dict[str, Any]]] = None):
+        """
+        Initialize the renderer.
+        
+        Args:
+            repo_path: Path to the repository
+            load_endpoint_data: Optional function returning the repository's parsed
+                endpoints, for callers that already cache the parse; the renderer
+                parses the repository itself when it is not given
+        """
         self.repo_path = repo_path
+        self._load_endpoint_data = load_endpoint_data
+        # Parsed repository data, loaded on first use and shared by every diagram type
+        self._endpoint_data: Optional[Dict[str, Any]] = None
+        self._feature_data: Optional[Dict[str, Any]] = None
+        self._load_lock = threading.Lock()
+        # Results rendered from the repository's own data, by diagram type
+        self._diagrams: Dict[str, Dict[str, Any]] = {}
+    
+    def _get_endpoint_data(self) -> Dict[str, Any]:
+        """Load the repository's parsed endpoints once per renderer."""
+        with self._load_lock:
+            if self._endpoint_data is None:
+                if self._load_endpoint_data is not None:
+                    self._endpoint_data = self._load_endpoint_data()
+                else:
+                    from ..services.endpoint_parser import EndpointParser
+                    endpoint_parser = EndpointParser()
+                    self._endpoint_data = endpoint_parser.parse_endpoints(self.repo_path)
+            return self._endpoint_data
+    
+    def _get_feature_data(self) -> Dict[str, Any]:
+        """Build the repository's feature data once per renderer, from the parsed endpoints."""
+        endpoint_data = self._get_endpoint_data()
+        with self._load_lock:
+            if self._feature_data is None:
+                from ..services.feature_builder import FeatureBuilder
+                feature_builder = FeatureBuilder()
+                self._feature_data = feature_builder.extract_feature_files(self.repo_path, endpoint_data)
+            return self._feature_data
+    
+    @staticmethod
+    def _use_case_id(title: str) -> str:
+        """Turn a scenario title into a lowercase PlantUML identifier."""
+        if title.isascii():
+            return title.lower().translate(_SANITIZE_TABLE)
+        # Non-ASCII characters are replaced before lowercasing, as some lowercase to ASCII
+        return _SANITIZE_RE.sub('_', title).lower()
+    
+    @staticmethod
+    def _most_connected(endpoints: List[Dict[str, Any]], edge_budget: int) -> List[Dict[str, Any]]:
+        """
+        Return the endpoints with the most service calls whose edges fit edge_budget, in their original order.
+        
+        Each endpoint costs one actor edge plus one edge per service call. The
+        most connected endpoint is always kept.
+        """
+        call_counts = [len(endpoint.get("service_calls") or ()) for endpoint in endpoints]
+        keep = []
+        for i in sorted(range(len(endpoints)), key=call_counts.__getitem__, reverse=True):
+            edges = 1 + call_counts[i]
+            if edges <= edge_budget or not keep:
+                keep.append(i)
+                edge_budget -= edges
+        return [endpoints[i] for i in sorted(keep)]
     
     @staticmethod
     def generate_use_case_diagram(features_data: Dict[str, Any]) -> str:
         """Generate a PlantUML use-case diagram from feature files or endpoint data."""
+        buf = io.StringIO()
+        DiagramRenderer.stream_use_case_diagram(features_data, buf)
+        return buf.getvalue()
+    
+    @staticmethod
+    def stream_use_case_diagram(features_data: Dict[str, Any], out: TextIO) -> None:
+        """Write a PlantUML use-case diagram from feature files or endpoint data to out."""
+        
+        features = features_data.get("features") or ()
+        if not features:
+            out.write("@startuml\nnote \"No features found in the repository.\"\n@enduml")
+            return
         
-        puml = ["@startuml", "left to right direction", "skinparam packageStyle rectangle"]
+        w = out.write
+        w("@startuml\n"
+          "left to right direction\n"
+          "skinparam packageStyle rectangle\n")
         
         # Add actors
         actors = set(["User", "Admin", "System"])  # Default actors
         
         # Add more actors from feature files if available
-        for feature in features_data.get("features", []):
+        for feature in features:
             for scenario in feature.get("scenarios", []):
                 # Extract actor from scenario title if format is "Actor does something"
                 scenario_title = scenario.get("title", "")
-                actor_match = re.match(r"^([A-Za-z]+)\s+(can|should|must|will)\s+", scenario_title)
+                if not scenario_title:
+                    continue
+                actor_match = _ACTOR_RE.match(scenario_title)
                 if actor_match:
                     actors.add(actor_match.group(1))
 
         # Add actor definitions
         for actor in sorted(actors):
-            puml.append(f"actor {actor}")
+            w(f"actor {actor}\n")
+        
+        # Lowercase each actor once rather than once per scenario
+        actors_lc = [(actor, actor.lower()) for actor in actors]
         
         # Add rectangles for each feature group
-        for feature in features_data.get("features", []):
+        for feature in features:
             feature_name = feature.get("title", "Feature").replace(" ", "_")
             
-            puml.append(f'rectangle "{feature.get("title", "Feature")}" {{')
+            w(f'rectangle "{feature.get("title", "Feature")}" {{\n')
             
             # Add use cases for each scenario
             for scenario in feature.get("scenarios", []):
-                use_case_name = scenario.get("title", "").replace('"', "'")
-                use_case_id = re.sub(r'[^A-Za-z0-9_]', '_', scenario.get("title", "")).lower()
+                title = scenario.get("title", "")
+                use_case_name = title.replace('"', "'")
+                use_case_id = DiagramRenderer._use_case_id(title)
                 
-                puml.append(f'  usecase "{use_case_name}" as {use_case_id}')
+                w(f'  usecase "{use_case_name}" as {use_case_id}\n')
                 
-                # Try to determine which actor is involved
-                for actor in actors:
-                    if actor.lower() in scenario.get("title", "").lower():
-                        puml.append(f'  {actor} -- {use_case_id}')
-                        break
-                else:
-                    # Default to User if no specific actor identified
-                    puml.append(f'  User -- {use_case_id}')
+                # Try to determine which actor is involved, defaulting to User
+                title_lc = title.lower()
+                actor = next((actor for actor, actor_lc in actors_lc if actor_lc in title_lc), "User")
+                w(f'  {actor} -- {use_case_id}\n')
             
-            puml.append('}')
+            w('}\n')
         
-        puml.append("@enduml")
-        return "\n".join(puml)
+        w("@enduml")
     
     @staticmethod
     def generate_comprehensive_use_case_diagram(architecture_data: Dict[str, Any]) -> str:
         """Generate a comprehensive PlantUML use-case diagram showing controllers, endpoints, and actors with complete flow."""
-        
-        puml = [
-            "@startuml",
-            "skinparam usecase {",
-            "  BackgroundColor LightBlue",
-            "  BorderColor DarkBlue",
-            "  ArrowColor Navy",
-            "  ActorBorderColor black",
-            "  ActorBackgroundColor white",
-            "}",
-            "skinparam packageStyle rectangle",
-            "skinparam linetype ortho",
-            "skinparam arrowThickness 1.5",
-            "skinparam packageBackgroundColor AliceBlue",
-            "left to right direction",
-            ""
-        ]
+        buf = io.StringIO()
+        DiagramRenderer.stream_comprehensive_use_case_diagram(architecture_data, buf)
+        return buf.getvalue()
+    
+    @staticmethod
+    def stream_comprehensive_use_case_diagram(architecture_data: Dict[str, Any], out: TextIO) -> None:
+        """Write a comprehensive PlantUML use-case diagram showing controllers, endpoints, and actors with complete flow to out."""
         
         # Extract all endpoints
         endpoints = architecture_data.get("endpoints", [])
@@ -90,206 +312,239 @@ class DiagramRenderer:
         service_repo_mappings = architecture_data.get("architecture", {}).get("service_repository", {})
         
         if not endpoints:
-            return "@startuml\nnote \"No endpoints found in the repository.\"\n@enduml"
+            out.write("@startuml\nnote \"No endpoints found in the repository.\"\n@enduml")
+            return
+        
+        w = out.write
+        w("@startuml\n"
+          "skinparam usecase {\n"
+          "  BackgroundColor LightBlue\n"
+          "  BorderColor DarkBlue\n"
+          "  ArrowColor Navy\n"
+          "  ActorBorderColor black\n"
+          "  ActorBackgroundColor white\n"
+          "}\n"
+          "skinparam packageStyle rectangle\n"
+          "skinparam linetype ortho\n"
+          "skinparam arrowThickness 1.5\n"
+          "skinparam packageBackgroundColor AliceBlue\n"
+          "left to right direction\n"
+          "\n")
+        
+        # Keep the diagram within DIAGRAM_MAX_EDGES: every endpoint is connected to
+        # an actor and to each service it calls, and every mapped repository adds more
+        endpoint_edges = sum(1 + len(endpoint.get("service_calls") or ()) for endpoint in endpoints)
+        repository_edges = sum(len(repos) for repos in service_repo_mappings.values())
+        if endpoint_edges + repository_edges > DIAGRAM_MAX_EDGES:
+            total_endpoints = len(endpoints)
+            endpoints = DiagramRenderer._most_connected(endpoints, DIAGRAM_MAX_EDGES - repository_edges)
+            logger.warning(f"Comprehensive use-case diagram limited to {len(endpoints)} of {total_endpoints} endpoints")
+            w(f'note "Diagram truncated to the {len(endpoints)} most connected of {total_endpoints} endpoints for readability"\n\n')
         
-        # Identify all controllers and organize by layer
+        # Services, repositories and entities appear in many connections, so
+        # their names and use-case ids are built once and looked up after that
+        safe_names = _SafeNames()
+        use_case_ids = _UseCaseIds(safe_names)
+        
+        # Identify all controllers and organize by layer, and collect the calls
+        # made to each service in the same pass. Each endpoint's use-case id is
+        # created here and reused by every later section.
         controllers = {}
+        calls_by_service = {}
+        endpoint_use_case_ids = []
         for endpoint in endpoints:
             controller = endpoint.get("controller", "Unknown")
+            use_case_id = f"{controller}_{endpoint.get('method', '')}"
+            endpoint_use_case_ids.append(use_case_id)
             if controller not in controllers:
                 controllers[controller] = []
-            controllers[controller].append(endpoint)
+            controllers[controller].append((endpoint, use_case_id))
+            for service_call in endpoint.get("service_calls", ()):
+                calls_by_service.setdefault(service_call.get("service"), []).append(service_call)
 
         # Draw actors
-        puml.append('actor "Client" as Client')
-        puml.append('actor "Administrator" as Admin')
-        puml.append('actor "System" as System')
-        puml.append("")
+        w('actor "Client" as Client\n')
+        w('actor "Administrator" as Admin\n')
+        w('actor "System" as System\n')
+        w("\n")
         
         # Draw the system boundary
-        puml.append('rectangle "Application System" {')
+        w('rectangle "Application System" {\n')
         
         # 1. CONTROLLER LAYER - API ENDPOINTS
-        puml.append('  package "API Layer" {')
+        # The actor connecting to each endpoint is chosen in the same pass; its
+        # edges are drawn after the database, in first-seen order, each once
+        actor_edges = {}
+        w('  package "API Layer" {\n')
         # Group endpoints by controller
         for controller, controller_endpoints in controllers.items():
-            puml.append(f'    package "{controller}" {{')
+            w(f'    package "{controller}" {{\n')
+            admin_controller = "admin" in controller.lower()
             
             # Add all use cases for this controller
-            for endpoint in controller_endpoints:
+            for endpoint, use_case_id in controller_endpoints:
                 method = endpoint.get("method", "")
                 path = endpoint.get("path", "")
                 http_method = endpoint.get("http_method", "")
                 
-                # Create unique IDs for use cases
-                use_case_id = f"{controller}_{method}"
-                
                 # Create descriptive labels
                 use_case_desc = f"{method}\\n<size:9>{http_method} {path}</size>"
                 
-                puml.append(f'      usecase "{use_case_desc}" as {use_case_id}')
+                w(f'      usecase "{use_case_desc}" as {use_case_id}\n')
+                
+                # Determine which actor should connect to this endpoint
+                method_lc = method.lower()
+                if admin_controller or "manage" in method_lc:
+                    actor_edges[f'Admin --> {use_case_id}\n'] = None
+                elif _SYSTEM_METHOD_RE.search(method_lc):
+                    actor_edges[f'System --> {use_case_id}\n'] = None
+                else:
+                    actor_edges[f'Client --> {use_case_id}\n'] = None
             
-            puml.append('    }')
-        puml.append('  }')
+            w('    }\n')
+        w('  }\n')
         
         # 2. SERVICE LAYER
-        puml.append('  package "Business Layer" {')
+        w('  package "Business Layer" {\n')
         for service_name, service_methods in services.items():
-            service_safe_name = service_name.replace('.', '_')
             # Create a package for each service
-            puml.append(f'    package "{service_name}" {{')
+            w(f'    package "{service_name}" {{\n')
             
             # Add use cases for service methods
             methods = service_methods.get("methods", [])
             if methods:
                 for method in methods:
                     method_name = method.get("name", "unknown")
-                    use_case_id = f"{service_safe_name}_{method_name}"
-                    puml.append(f'      usecase "{method_name}" as {use_case_id}')
+                    w(f'      usecase "{method_name}" as {use_case_ids[service_name, method_name]}\n')
             else:
                 # If no methods were extracted, add placeholder based on endpoint service calls
-                for endpoint in endpoints:
-                    for service_call in endpoint.get("service_calls", []):
-                        if service_call.get("service") == service_name:
-                            method_name = service_call.get("method", "unknown")
-                            use_case_id = f"{service_safe_name}_{method_name}"
-                            puml.append(f'      usecase "{method_name}" as {use_case_id}')
+                for service_call in calls_by_service.get(service_name, ()):
+                    method_name = service_call.get("method", "unknown")
+                    w(f'      usecase "{method_name}" as {use_case_ids[service_name, method_name]}\n')
             
-            puml.append('    }')
-        puml.append('  }')
+            w('    }\n')
+        w('  }\n')
         
         # 3. REPOSITORY LAYER
-        puml.append('  package "Data Access Layer" {')
+        w('  package "Data Access Layer" {\n')
         for repo_name in repositories:
-            repo_safe_name = repo_name.replace('.', '_')
             # Create a package for each repository
-            puml.append(f'    package "{repo_name}" {{')
+            w(f'    package "{repo_name}" {{\n')
             
             # Add common repository operations
-            for operation in ["save", "find", "update", "delete"]:
-                use_case_id = f"{repo_safe_name}_{operation}"
-                puml.append(f'      usecase "{operation}" as {use_case_id}')
+            w(_REPO_USE_CASE_LINES.format(repo=safe_names[repo_name]))
             
-            puml.append('    }')
-        puml.append('  }')
+            w('    }\n')
+        w('  }\n')
         
-        puml.append('}')
+        w('}\n')
         
         # Add database outside the system
-        puml.append('database "Database" {')
+        w('database "Database" {\n')
         for entity_name in entities:
-            safe_entity_name = entity_name.replace('.', '_')
-            puml.append(f'  usecase "{entity_name}" as Entity_{safe_entity_name}')
-        puml.append('}')
-        puml.append("")
+            safe_entity_name = safe_names[entity_name]
+            w(f'  usecase "{entity_name}" as Entity_{safe_entity_name}\n')
+        w('}\n')
+        w("\n")
         
         # Connect actors to controller endpoints
-        for controller, controller_endpoints in controllers.items():
-            for endpoint in controller_endpoints:
-                method = endpoint.get("method", "")
-                http_method = endpoint.get("http_method", "").upper()
-                use_case_id = f"{controller}_{method}"
-                
-                # Determine which actor should connect to this endpoint
-                if "admin" in controller.lower() or "manage" in method.lower():
-                    puml.append(f'Admin --> {use_case_id}')
-                elif "schedule" in method.lower() or "batch" in method.lower() or "job" in method.lower():
-                    puml.append(f'System --> {use_case_id}')
-                else:
-                    puml.append(f'Client --> {use_case_id}')
+        w("".join(actor_edges))
         
-        # Connect controller endpoints to service methods
-        for endpoint in endpoints:
-            controller = endpoint.get("controller", "")
-            method = endpoint.get("method", "")
-            controller_use_case_id = f"{controller}_{method}"
-            
-            # Connect to services via service calls
-            for service_call in endpoint.get("service_calls", []):
-                service_name = service_call.get("service", "")
-                service_method = service_call.get("method", "")
-                if service_name and service_method:
-                    service_safe_name = service_name.replace('.', '_')
-                    service_use_case_id = f"{service_safe_name}_{service_method}"
-                    puml.append(f'{controller_use_case_id} ..> {service_use_case_id} : <<calls>>')
-        
-        # Connect service methods to repository methods
-        for service_name, repos in service_repo_mappings.items():
-            service_safe_name = service_name.replace('.', '_')
+        # Draw each relationship once, however many endpoints or calls imply it,
+        # and stop once the diagram has DIAGRAM_MAX_EDGES of them
+        emitted_edges = set()
+        edges_left = DIAGRAM_MAX_EDGES - len(actor_edges)
+        def edge(lines: str, count: int = 1) -> None:
+            """Write count relationships that are always drawn together."""
+            nonlocal edges_left
+            if lines not in emitted_edges:
+                if edges_left < count:
+                    raise _EdgeLimitReached()
+                edges_left -= count
+                emitted_edges.add(lines)
+                w(lines)
+        
+        try:
+            # Connect controller endpoints to service methods
+            for endpoint, controller_use_case_id in zip(endpoints, endpoint_use_case_ids):
+                # Connect to services via service calls
+                for service_call in endpoint.get("service_calls", ()):
+                    service_name = service_call.get("service", "")
+                    service_method = service_call.get("method", "")
+                    if service_name and service_method:
+                        edge(f'{controller_use_case_id} ..> {use_case_ids[service_name, service_method]} : <<calls>>\n')
             
-            # For each service, connect its methods to appropriate repository methods
-            for repo in repos:
-                repo_safe_name = repo.replace('.', '_')
+            # Connect service methods to repository methods, using the calls
+            # collected per service rather than rescanning every endpoint
+            for service_name, repos in service_repo_mappings.items():
+                # Determine the repository method for each call once, for all repositories
+                connections = []
+                for service_call in calls_by_service.get(service_name, ()):
+                    service_method = service_call.get("method", "")
+                    # Determine appropriate repository method based on service method name
+                    repo_method = _REPO_OPERATIONS.get(_method_prefix(service_method), "find")
+                    connections.append((use_case_ids[service_name, service_method], repo_method))
                 
-                # Connect service methods to repository methods
-                for endpoint in endpoints:
-                    for service_call in endpoint.get("service_calls", []):
-                        if service_call.get("service") == service_name:
-                            service_method = service_call.get("method", "")
-                            service_use_case_id = f"{service_safe_name}_{service_method}"
-                            
-                            # Determine appropriate repository method based on service method name
-                            repo_method = ""
-                            if service_method.startswith("get") or service_method.startswith("find"):
-                                repo_method = "find"
-                            elif service_method.startswith("save") or service_method.startswith("create"):
-                                repo_method = "save"
-                            elif service_method.startswith("update"):
-                                repo_method = "update"
-                            elif service_method.startswith("delete") or service_method.startswith("remove"):
-                                repo_method = "delete"
-                            else:
-                                # Default to find if we can't determine
-                                repo_method = "find"
-                            
-                            repo_use_case_id = f"{repo_safe_name}_{repo_method}"
-                            puml.append(f'{service_use_case_id} ..> {repo_use_case_id} : <<uses>>')
-        
-        # Connect repositories to database entities
-        for repo_name in repositories:
-            repo_safe_name = repo_name.replace('.', '_')
+                # For each service, connect its methods to appropriate repository methods
+                for repo in repos:
+                    for service_use_case_id, repo_method in connections:
+                        edge(f'{service_use_case_id} ..> {use_case_ids[repo, repo_method]} : <<uses>>\n')
             
-            # Find matching entity for this repository
-            for entity_name in entities:
-                entity_simple_name = entity_name.split('.')[-1] if '.' in entity_name else entity_name
-                repo_simple_name = repo_name.split('.')[-1] if '.' in repo_name else repo_name
+            # Connect repositories to database entities. Entity names are reduced to
+            # their lowercase simple names once, not once per repository.
+            entity_keys = [
+                (entity_name.rsplit('.', 1)[-1].lower(), safe_names[entity_name])
+                for entity_name in entities
+            ]
+            for repo_name in repositories:
+                repo_key = repo_name.rsplit('.', 1)[-1].lower().replace("repository", "")
                 
-                # Check if repository name matches entity name pattern (e.g., UserRepository -> User)
-                if entity_simple_name.lower() in repo_simple_name.lower().replace("repository", ""):
-                    safe_entity_name = entity_name.replace('.', '_')
-                    
-                    # Connect all repository operations to the entity
-                    for operation in ["save", "find", "update", "delete"]:
-                        repo_use_case_id = f"{repo_safe_name}_{operation}"
-                        puml.append(f'{repo_use_case_id} ..> Entity_{safe_entity_name} : <<accesses>>')
+                # Find matching entity for this repository
+                for entity_key, safe_entity_name in entity_keys:
+                    # Check if repository name matches entity name pattern (e.g., UserRepository -> User)
+                    if entity_key in repo_key:
+                        # Connect all repository operations to the entity
+                        edge(
+                            _REPO_ENTITY_EDGE_LINES.format(repo=safe_names[repo_name], entity=safe_entity_name),
+                            len(_REPO_USE_CASES)
+                        )
+        except _EdgeLimitReached:
+            logger.warning(f"Comprehensive use-case diagram truncated at {DIAGRAM_MAX_EDGES} relationships")
+            w(f'note "Relationships truncated at {DIAGRAM_MAX_EDGES} for readability"\n')
         
         # Add a legend explaining the different levels and relationships
-        puml.append("")
-        puml.append('legend right')
-        puml.append('  Multi-Level Flow Diagram')
-        puml.append('  ======================')
-        puml.append('  Level 1: Client/User → API Endpoints')
-        puml.append('  Level 2: API Endpoints → Service Methods')
-        puml.append('  Level 3: Service Methods → Repository Methods')
-        puml.append('  Level 4: Repository Methods → Database Entities')
-        puml.append('  ')
-        puml.append('  Relationship Types:')
-        puml.append('  → : Actor initiates action')
-        puml.append('  ..> : Component uses another component')
-        puml.append('endlegend')
-        
-        puml.append("@enduml")
-        
-        return "\n".join(puml)
+        w("\n")
+        w('legend right\n'
+          '  Multi-Level Flow Diagram\n'
+          '  ======================\n'
+          '  Level 1: Client/User → API Endpoints\n'
+          '  Level 2: API Endpoints → Service Methods\n'
+          '  Level 3: Service Methods → Repository Methods\n'
+          '  Level 4: Repository Methods → Database Entities\n'
+          '  \n'
+          '  Relationship Types:\n'
+          '  → : Actor initiates action\n'
+          '  ..> : Component uses another component\n'
+          'endlegend\n')
+        
+        w("@enduml")
     
     @staticmethod
     def generate_interaction_diagram(endpoints_data: List[Dict[str, Any]]) -> str:
         """Generate a PlantUML sequence diagram showing controller-service-repo interactions."""
+        buf = io.StringIO()
+        DiagramRenderer.stream_interaction_diagram(endpoints_data, buf)
+        return buf.getvalue()
+    
+    @staticmethod
+    def stream_interaction_diagram(endpoints_data: List[Dict[str, Any]], out: TextIO) -> None:
+        """Write a PlantUML sequence diagram showing controller-service-repo interactions to out."""
         
-        puml = ["@startuml", "skinparam sequenceArrowThickness 2", "skinparam roundcorner 5"]
+        w = out.write
+        w(_INTERACTION_DIAGRAM_HEADER)
         
-        # Add participants
-        participants = set(["Client"])
+        # Add participants, declared in the order they are first seen
+        participants = {"Client": None}
         
         # Group endpoints by controller
         controllers = {}
@@ -300,93 +555,95 @@ class DiagramRenderer:
             controllers[controller].append(endpoint)
             
             # Add controller to participants
-            participants.add(f"{controller}")
+            participants[f"{controller}"] = None
             
             # Extract service and repo names based on conventions if implementation available
-            if endpoint.get("implementation"):
-                impl = endpoint.get("implementation", "")
+            impl = endpoint.get("implementation")
+            if impl:
                 if "service" in impl.lower():
-                    service_match = re.search(r'(\w+)Service\.', impl)
+                    service_match = _SERVICE_RE.search(impl)
                     if service_match:
-                        participants.add(f"{service_match.group(1)}Service")
+                        participants[f"{service_match.group(1)}Service"] = None
                         
                         # Assume repository follows naming convention
-                        participants.add(f"{service_match.group(1)}Repository")
+                        participants[f"{service_match.group(1)}Repository"] = None
             
             # Add services and repositories from endpoint data
-            if "services" in endpoint:
-                for service in endpoint["services"]:
-                    participants.add(service)
-            
-            if "repositories" in endpoint:
-                for repo in endpoint["repositories"]:
-                    participants.add(repo)
+            participants.update(dict.fromkeys(endpoint.get("services", ())))
+            participants.update(dict.fromkeys(endpoint.get("repositories", ())))
             
             # Add service calls from implementation analysis
-            for service_call in endpoint.get("service_calls", []):
+            for service_call in endpoint.get("service_calls", ()):
                 if "service" in service_call:
-                    participants.add(service_call["service"])
+                    participants[service_call["service"]] = None
         
         # Add participant definitions
-        puml.append("participant Client")
-        for participant in sorted(list(participants - {"Client"})):
-            puml.append(f"participant {participant}")
+        for participant in participants:
+            w(f"participant {participant}\n")
         
         # Add interactions for each endpoint
         for controller_name, controller_endpoints in controllers.items():
             for endpoint in controller_endpoints:
                 method = endpoint.get("http_method", "GET")
                 path = endpoint.get("path", "/")
+                service_calls = endpoint.get("service_calls")
+                repositories = endpoint.get("repositories", ())
                 
                 # Start the interaction
-                puml.append("\n== " + method + " " + path + " ==")
-                puml.append(f"Client -> {controller_name}: {method} {path}")
+                w(f"\n== {method} {path} ==\n")
+                w(f"Client -> {controller_name}: {method} {path}\n")
                 
                 # If we have service calls from implementation analysis, use them
-                if endpoint.get("service_calls"):
-                    for service_call in endpoint.get("service_calls", []):
+                if service_calls:
+                    for service_call in service_calls:
                         service_name = service_call.get("service")
                         method_name = service_call.get("method")
                         
                         if service_name and method_name:
-                            puml.append(f"{controller_name} -> {service_name}: {method_name}()")
+                            w(f"{controller_name} -> {service_name}: {method_name}()\n")
                             
                             # Look for repository calls related to this service
-                            if "repositories" in endpoint:
-                                for repo in endpoint["repositories"]:
-                                    # Assume a repository method based on the service method
-                                    repo_method = "findBy" + method_name[0].upper() + method_name[1:] if method_name.startswith("get") else method_name
-                                    puml.append(f"{service_name} -> {repo}: {repo_method}()")
-                                    puml.append(f"{repo} --> {service_name}: returns data")
+                            if repositories:
+                                # Assume a repository method based on the service method
+                                repo_method = "findBy" + method_name[0].upper() + method_name[1:] if method_name.startswith("get") else method_name
+                                for repo in repositories:
+                                    w(f"{service_name} -> {repo}: {repo_method}()\n")
+                                    w(f"{repo} --> {service_name}: returns data\n")
                             
-                            puml.append(f"{service_name} --> {controller_name}: returns result")
+                            w(f"{service_name} --> {controller_name}: returns result\n")
                 
                 # If no specific service calls, but we know about services, use those
-                elif "services" in endpoint and not endpoint.get("service_calls"):
+                elif "services" in endpoint:
+                    # Infer a service method from the endpoint method
+                    endpoint_method = endpoint.get("method", "process")
                     for service in endpoint["services"]:
-                        # Infer a service method from the endpoint method
-                        endpoint_method = endpoint.get("method", "process")
-                        puml.append(f"{controller_name} -> {service}: {endpoint_method}()")
+                        w(f"{controller_name} -> {service}: {endpoint_method}()\n")
                         
                         # Look for repository calls
-                        if "repositories" in endpoint:
-                            for repo in endpoint["repositories"]:
-                                puml.append(f"{service} -> {repo}: findData()")
-                                puml.append(f"{repo} --> {service}: returns data")
+                        if repositories:
+                            for repo in repositories:
+                                w(f"{service} -> {repo}: findData()\n")
+                                w(f"{repo} --> {service}: returns data\n")
                         
-                        puml.append(f"{service} --> {controller_name}: returns result")
+                        w(f"{service} --> {controller_name}: returns result\n")
                 
-                puml.append(f"{controller_name} --> Client: HTTP Response")
+                w(f"{controller_name} --> Client: HTTP Response\n")
         
-        puml.append("@enduml")
-        return "\n".join(puml)
+        w("@enduml")
     
     @staticmethod
     def generate_comprehensive_interaction_diagram(architecture_data: Dict[str, Any]) -> str:
         """Generate a comprehensive PlantUML sequence diagram showing the full system architecture."""
+        buf = io.StringIO()
+        DiagramRenderer.stream_comprehensive_interaction_diagram(architecture_data, buf)
+        return buf.getvalue()
+    
+    @staticmethod
+    def stream_comprehensive_interaction_diagram(architecture_data: Dict[str, Any], out: TextIO) -> None:
+        """Write a comprehensive PlantUML sequence diagram showing the full system architecture to out."""
         
-        puml = ["@startuml", "skinparam sequenceArrowThickness 2", "skinparam roundcorner 5", 
-                "skinparam maxMessageSize 200", "skinparam sequenceGroupBorderColor #888888", ""]
+        w = out.write
+        w(_COMPREHENSIVE_INTERACTION_DIAGRAM_HEADER)
         
         endpoints = architecture_data.get("endpoints", [])
         services = architecture_data.get("services", {})
@@ -418,37 +675,44 @@ class DiagramRenderer:
         # Add participant definitions with color coding
         for participant in participants:
             if participant == "Client":
-                puml.append("actor Client")
+                w("actor Client\n")
             elif participant == "Database":
-                puml.append("database Database")
+                w("database Database\n")
             elif participant in service_names:
-                puml.append(f"participant \"{participant}\" as {participant} #LightBlue")
+                w(f"participant \"{participant}\" as {participant} #LightBlue\n")
             elif participant in repo_names:
-                puml.append(f"participant \"{participant}\" as {participant} #LightGreen")
+                w(f"participant \"{participant}\" as {participant} #LightGreen\n")
             else:
-                puml.append(f"participant \"{participant}\" as {participant} #LightYellow")
+                w(f"participant \"{participant}\" as {participant} #LightYellow\n")
         
-        puml.append("")
+        w("\n")
+        
+        # The entity each mapped repository manages, if any: the first entity
+        # whose name appears in the repository name, ignoring case
+        entity_names_lc = [(entity_name, entity_name.lower()) for entity_name in entities]
+        entity_for_repo = {}
+        for repos in service_repo_mappings.values():
+            for repo in repos:
+                if repo not in entity_for_repo:
+                    repo_lc = repo.lower()
+                    entity_for_repo[repo] = next(
+                        (entity_name for entity_name, entity_name_lc in entity_names_lc if entity_name_lc in repo_lc),
+                        None
+                    )
         
         # Group endpoints by domain for better organization
-        domains = {
-            "Account Management": ["account", "customer", "card"],
-            "Transaction Processing": ["transaction", "deposit", "withdraw", "transfer"],
-            "Branch Operations": ["branch", "employee"],
-            "Customer Service": ["issue", "complaint", "pending-issues", "issue-fix"],
-            "Loan Services": ["loan", "payment-loan", "approve-loan", "bank-loan", "p2p-loan"],
-        }
-        
-        domain_endpoints = {}
-        for domain, keywords in domains.items():
-            domain_endpoints[domain] = []
-            for endpoint in endpoints:
-                path = endpoint.get("path", "").lower()
-                method = endpoint.get("method", "").lower()
-                    
-                # Check if this endpoint belongs to this domain
-                if any(keyword.lower() in path or keyword.lower() in method for keyword in keywords):
-                    domain_endpoints[domain].append(endpoint)
+        domain_endpoints = {domain: [] for domain in _DOMAIN_KEYWORDS}
+        for endpoint in endpoints:
+            path = endpoint.get("path", "").lower()
+            method = endpoint.get("method", "").lower()
+            
+            # Find every domain with a keyword in the path or method, in a single scan
+            matched_domains = {
+                _KEYWORD_DOMAINS[match.group(1)]
+                for match in _DOMAIN_KEYWORD_RE.finditer(f"{path}\n{method}")
+            }
+            for domain in matched_domains:
+                domain_endpoints[domain].append(endpoint)
         
         # Get representative endpoints from each domain for a comprehensive view
         shown_endpoints = []
@@ -474,7 +738,7 @@ class DiagramRenderer:
                 continue
                 
             # Add a group for the domain
-            puml.append(f"\ngroup {domain}")
+            w(f"\ngroup {domain}\n")
             
             # Add 1-2 representative interactions from this domain
             for endpoint in domain_eps[:min(2, len(domain_eps))]:
@@ -484,11 +748,11 @@ class DiagramRenderer:
                 endpoint_method = endpoint.get("method", "process")
                 
                 # Start the interaction
-                puml.append(f"\n== {method} {path} ==")
-                puml.append(f"Client -> {controller}: {endpoint_method}()")
+                w(f"\n== {method} {path} ==\n")
+                w(f"Client -> {controller}: {endpoint_method}()\n")
                 
                 # Get service calls from the endpoint data
-                service_calls = endpoint.get("service_calls", [])
+                service_calls = endpoint.get("service_calls", ())
                 
                 if service_calls:
                     # Use actual service calls from the code analysis
@@ -497,320 +761,315 @@ class DiagramRenderer:
                         method_name = service_call.get("method")
                         
                         if service_name and method_name:
-                            puml.append(f"{controller} -> {service_name}: {method_name}()")
+                            w(f"{controller} -> {service_name}: {method_name}()\n")
                             
                             # If we know about repos used by this service, show them
                             if service_name in service_repo_mappings:
+                                # Generate a plausible repository method name
+                                method_prefix = _method_prefix(method_name)
+                                if method_prefix in _QUERY_PREFIXES:
+                                    repo_method = method_name
+                                else:
+                                    repo_method = _REPO_CALLS.get(method_prefix) or f"{method_name}Data"
+                                
                                 for repo in service_repo_mappings[service_name]:
                                     # Identify entity managed by this repo if available
-                                    entity_type = None
-                                    for entity_name, entity_info in entities.items():
-                                        if entity_name.lower() in repo.lower():
-                                            entity_type = entity_name
-                                            break
-                                            
-                                    # Generate a plausible repository method name
-                                    if method_name.startswith("get") or method_name.startswith("find"):
-                                        repo_method = method_name
-                                    elif method_name.startswith("create") or method_name.startswith("add"):
-                                        repo_method = f"save"
-                                    elif method_name.startswith("update"):
-                                        repo_method = f"update"
-                                    elif method_name.startswith("delete") or method_name.startswith("remove"):
-                                        repo_method = f"delete"
-                                    else:
-                                        repo_method = f"{method_name}Data"
-                                        
+                                    entity_type = entity_for_repo[repo]
+                                    
                                     # Show repository interaction
-                                    puml.append(f"{service_name} -> {repo}: {repo_method}()")
+                                    w(f"{service_name} -> {repo}: {repo_method}()\n")
                                     
                                     # Show database interaction with entity if known
                                     if entity_type:
-                                        puml.append(f"{repo} -> Database: SQL [entity: {entity_type}]")
+                                        w(f"{repo} -> Database: SQL [entity: {entity_type}]\n")
                                     else:
-                                        puml.append(f"{repo} -> Database: SQL operation")
+                                        w(f"{repo} -> Database: SQL operation\n")
                                         
-                                    puml.append(f"Database --> {repo}: data")
-                                    puml.append(f"{repo} --> {service_name}: returns data")
+                                    w(f"Database --> {repo}: data\n")
+                                    w(f"{repo} --> {service_name}: returns data\n")
                             
-                            puml.append(f"{service_name} --> {controller}: returns result")
+                            w(f"{service_name} --> {controller}: returns result\n")
                 
                 # If no specific service calls, check controller-service mappings
                 elif controller in controller_service_mappings and not service_calls:
+                    # The inferred service and repository methods depend only on the
+                    # endpoint, so they are worked out once for all of its services
+                    endpoint_method_lc = endpoint_method.lower()
+                    
+                    # Infer a service method based on the endpoint method/path
+                    if "get" in endpoint_method_lc or method == "GET":
+                        service_method = "retrieve" + endpoint_method[3:] if endpoint_method.startswith("get") else f"get{endpoint_method}"
+                    elif "create" in endpoint_method_lc or method == "POST":
+                        service_method = "create" + endpoint_method[6:] if endpoint_method.startswith("create") else f"create{endpoint_method}"
+                    elif "update" in endpoint_method_lc or method == "PUT":
+                        service_method = "update" + endpoint_method[6:] if endpoint_method.startswith("update") else f"update{endpoint_method}"
+                    elif "delete" in endpoint_method_lc or method == "DELETE":
+                        service_method = "delete" + endpoint_method[6:] if endpoint_method.startswith("delete") else f"delete{endpoint_method}"
+                    else:
+                        service_method = endpoint_method
+                    
+                    # Generate plausible repo method
+                    service_method_lc = service_method.lower()
+                    if "get" in service_method_lc:
+                        repo_method = f"findBy{service_method[3:]}" if service_method.startswith("get") else f"findBy{service_method}"
+                    elif "create" in service_method_lc:
+                        repo_method = "save"
+                    elif "update" in service_method_lc:
+                        repo_method = "save"  # JPA typically uses save for update too
+                    elif "delete" in service_method_lc:
+                        repo_method = f"deleteBy{service_method[6:]}" if service_method.startswith("delete") else f"delete"
+                    else:
+                        repo_method = f"process{service_method}"
+                    
                     for service in controller_service_mappings[controller]:
-                        # Infer a service method based on the endpoint method/path
-                        if "get" in endpoint_method.lower() or method == "GET":
-                            service_method = "retrieve" + endpoint_method[3:] if endpoint_method.startswith("get") else f"get{endpoint_method}"
-                        elif "create" in endpoint_method.lower() or method == "POST":
-                            service_method = "create" + endpoint_method[6:] if endpoint_method.startswith("create") else f"create{endpoint_method}"
-                        elif "update" in endpoint_method.lower() or method == "PUT":
-                            service_method = "update" + endpoint_method[6:] if endpoint_method.startswith("update") else f"update{endpoint_method}"
-                        elif "delete" in endpoint_method.lower() or method == "DELETE":
-                            service_method = "delete" + endpoint_method[6:] if endpoint_method.startswith("delete") else f"delete{endpoint_method}"
-                        else:
-                            service_method = endpoint_method
-                            
-                        puml.append(f"{controller} -> {service}: {service_method}()")
+                        w(f"{controller} -> {service}: {service_method}()\n")
                         
                         # Check service-repo mappings
                         if service in service_repo_mappings:
                             for repo in service_repo_mappings[service]:
-                                # Generate plausible repo method
-                                if "get" in service_method.lower():
-                                    repo_method = f"findBy{service_method[3:]}" if service_method.startswith("get") else f"findBy{service_method}"
-                                elif "create" in service_method.lower():
-                                    repo_method = "save"
-                                elif "update" in service_method.lower():
-                                    repo_method = "save"  # JPA typically uses save for update too
-                                elif "delete" in service_method.lower():
-                                    repo_method = f"deleteBy{service_method[6:]}" if service_method.startswith("delete") else f"delete"
-                                else:
-                                    repo_method = f"process{service_method}"
-                                    
-                                puml.append(f"{service} -> {repo}: {repo_method}()")
-                                puml.append(f"{repo} -> Database: execute SQL")
-                                puml.append(f"Database --> {repo}: result")
-                                puml.append(f"{repo} --> {service}: data")
+                                w(f"{service} -> {repo}: {repo_method}()\n")
+                                w(f"{repo} -> Database: execute SQL\n")
+                                w(f"Database --> {repo}: result\n")
+                                w(f"{repo} --> {service}: data\n")
                         
-                        puml.append(f"{service} --> {controller}: result")
+                        w(f"{service} --> {controller}: result\n")
                 
                 # Fallback for cases with no service information
                 else:
                     # For controllers with no explicit service calls, show a generic flow
-                    puml.append(f"{controller} -> {controller}: process request")
+                    w(f"{controller} -> {controller}: process request\n")
                     
                     # Suggest possible service based on controller name
                     suggested_service = controller.replace("Controller", "Service")
                     if suggested_service in service_names:
-                        puml.append(f"{controller} -> {suggested_service}: process{endpoint_method}()")
-                        puml.append(f"{suggested_service} --> {controller}: returns result")
+                        w(f"{controller} -> {suggested_service}: process{endpoint_method}()\n")
+                        w(f"{suggested_service} --> {controller}: returns result\n")
                 
-                puml.append(f"{controller} --> Client: HTTP {method} Response")
+                w(f"{controller} --> Client: HTTP {method} Response\n")
             
-            puml.append("end")  # End of domain group
+            w("end\n")  # End of domain group
         
-        puml.append("\n@enduml")
-        return "\n".join(puml)
+        w("\n@enduml")
+    
+    @staticmethod
+    def _write_entity_classes(w: Callable[[str], Any], entities: Dict[str, Any]) -> None:
+        """Write a class, with its fields and table note, for each entity."""
+        for entity_name, entity_data in entities.items():
+            w(f'  class {entity_name} <<Entity>> {{\n')
+            
+            # Add fields
+            for field in entity_data.get("fields", []):
+                field_name = field.get("name", "")
+                field_type = field.get("type", "")
+                w(f"    {field_type} {field_name}\n")
+            
+            w("  }\n")
+            
+            # Add table annotation if available
+            if "table_name" in entity_data:
+                w(f'  note bottom of {entity_name} : @Table(name="{entity_data["table_name"]}")\n')
+    
+    @staticmethod
+    def _write_repository_classes(w: Callable[[str], Any], repositories: Dict[str, Any]) -> None:
+        """Write an interface, with its methods, for each repository."""
+        for repo_name, repo_data in repositories.items():
+            w(f'  interface {repo_name} <<Repository>> {{\n')
+            
+            # Add methods
+            for method in repo_data.get("methods", []):
+                method_name = method.get("name", "")
+                entity_type = method.get("entity_type", "Object")
+                w(f"    {entity_type} {method_name}()\n")
+            
+            w("  }\n")
+    
+    @staticmethod
+    def _write_service_classes(w: Callable[[str], Any], services: Dict[str, Any]) -> None:
+        """Write a class, with its methods, for each service."""
+        for service_name, service_data in services.items():
+            w(f'  class {service_name} <<Service>> {{\n')
+            
+            # Add methods
+            for method in service_data.get("methods", []):
+                method_name = method.get("name", "")
+                return_type = method.get("return_type", "void")
+                w(f"    {return_type} {method_name}()\n")
+            
+            w("  }\n")
+    
+    @staticmethod
+    def _write_controller_classes(w: Callable[[str], Any], controllers: Dict[str, List[str]]) -> None:
+        """Write a class, with its already formatted endpoint methods, for each controller."""
+        for controller_name, method_lines in controllers.items():
+            w(f'  class {controller_name} <<Controller>> {{\n')
+            w("".join(method_lines))
+            w("  }\n")
     
     @staticmethod
     def generate_class_diagram(architecture_data: Dict[str, Any]) -> str:
         """Generate a PlantUML class diagram showing entities, repositories, services, and controllers."""
+        buf = io.StringIO()
+        DiagramRenderer.stream_class_diagram(architecture_data, buf)
+        return buf.getvalue()
+    
+    @staticmethod
+    def stream_class_diagram(architecture_data: Dict[str, Any], out: TextIO) -> None:
+        """Write a PlantUML class diagram showing entities, repositories, services, and controllers to out."""
         
-        puml = [
-            "@startuml",
-            "skinparam classAttributeIconSize 0",
-            "skinparam classFontSize 12",
-            "skinparam classFontName Arial",
-            "skinparam classBackgroundColor LightCyan",
-            "skinparam stereotypeCBackgroundColor Yellow",
-            "skinparam packageBackgroundColor WhiteSmoke",
-            "skinparam arrowColor Navy",
-            "skinparam arrowThickness 1.5",
-            "skinparam linetype ortho",
-            ""
-        ]
+        w = out.write
+        w(_CLASS_DIAGRAM_HEADER)
         
         entities = architecture_data.get("entities", {})
         repositories = architecture_data.get("repositories", {})
         services = architecture_data.get("services", {})
         endpoints = architecture_data.get("endpoints", [])
         
-        # Extract controllers from endpoints
+        # Extract controllers from endpoints, formatting each endpoint as a
+        # method line up front and keeping each controller's raw endpoints for
+        # the service inference below
         controllers = {}
+        endpoints_by_controller = {}
         for endpoint in endpoints:
             controller = endpoint.get("controller")
-            if controller and controller not in controllers:
-                controllers[controller] = {"endpoints": []}
-            if controller:
-                controllers[controller]["endpoints"].append({
-                    "method": endpoint.get("method"),
-                    "http_method": endpoint.get("http_method"),
-                    "path": endpoint.get("path")
-                })
-        
-        # Organize components by domains/packages
-        domains = {
-            "Models": [],
-            "Repositories": [],
-            "Services": [],
-            "Controllers": []
-        }
-        
-        # Assign entities to domains
-        for entity_name in entities:
-            domains["Models"].append(entity_name)
-        
-        # Assign repositories to domains
-        for repo_name in repositories:
-            domains["Repositories"].append(repo_name)
-        
-        # Assign services to domains
-        for service_name in services:
-            domains["Services"].append(service_name)
-        
-        # Assign controllers to domains
-        for controller_name in controllers:
-            domains["Controllers"].append(controller_name)
+            if not controller:
+                continue
+            endpoints_by_controller.setdefault(controller, []).append(endpoint)
+            controllers.setdefault(controller, []).append(
+                f'    @{endpoint.get("http_method")}("{endpoint.get("path")}") {endpoint.get("method")}()\n'
+            )
         
-        # Add packages for each domain
-        for domain, components in domains.items():
+        # Add a package for each kind of component that is present
+        packages = (
+            ("Models", DiagramRenderer._write_entity_classes, entities),
+            ("Repositories", DiagramRenderer._write_repository_classes, repositories),
+            ("Services", DiagramRenderer._write_service_classes, services),
+            ("Controllers", DiagramRenderer._write_controller_classes, controllers)
+        )
+        for domain, write_classes, components in packages:
             if components:
-                puml.append(f'package "{domain}" {{')
-                
-                if domain == "Models":
-                    # Add entities
-                    for entity_name in components:
-                        entity_data = entities.get(entity_name, {})
-                        puml.append(f'  class {entity_name} <<Entity>> {{')
-                        
-                        # Add fields
-                        for field in entity_data.get("fields", []):
-                            field_name = field.get("name", "")
-                            field_type = field.get("type", "")
-                            puml.append(f"    {field_type} {field_name}")
-                        
-                        puml.append("  }")
-                        
-                        # Add table annotation if available
-                        if "table_name" in entity_data:
-                            puml.append(f'  note bottom of {entity_name} : @Table(name="{entity_data["table_name"]}")')
-                
-                elif domain == "Repositories":
-                    # Add repositories
-                    for repo_name in components:
-                        repo_data = repositories.get(repo_name, {})
-                        puml.append(f'  interface {repo_name} <<Repository>> {{')
-                        
-                        # Add methods
-                        for method in repo_data.get("methods", []):
-                            method_name = method.get("name", "")
-                            entity_type = method.get("entity_type", "Object")
-                            puml.append(f"    {entity_type} {method_name}()")
-                        
-                        puml.append("  }")
-                
-                elif domain == "Services":
-                    # Add services
-                    for service_name in components:
-                        service_data = services.get(service_name, {})
-                        puml.append(f'  class {service_name} <<Service>> {{')
-                        
-                        # Add methods
-                        for method in service_data.get("methods", []):
-                            method_name = method.get("name", "")
-                            return_type = method.get("return_type", "void")
-                            puml.append(f"    {return_type} {method_name}()")
-                        
-                        puml.append("  }")
-                
-                elif domain == "Controllers":
-                    # Add controllers
-                    for controller_name in components:
-                        controller_data = controllers.get(controller_name, {})
-                        puml.append(f'  class {controller_name} <<Controller>> {{')
-                        
-                        # Add endpoints as methods
-                        for endpoint in controller_data.get("endpoints", []):
-                            method_name = endpoint.get("method", "")
-                            http_method = endpoint.get("http_method", "")
-                            path = endpoint.get("path", "")
-                            puml.append(f"    @{http_method}(\"{path}\") {method_name}()")
-                        
-                        puml.append("  }")
-                
-                puml.append('}')
-                puml.append('')
+                w(f'package "{domain}" {{\n')
+                write_classes(w, components)
+                w('}\n\n')
         
         # Add relationships between entities based on field types
-        puml.append("' Entity relationships")
+        w("' Entity relationships\n")
         for entity_name, entity_data in entities.items():
-            for field in entity_data.get("fields", []):
-                field_type = field.get("type", "")
+            fields = entity_data.get("fields")
+            if not fields:
+                continue
+            # One relationship per referenced type, however many fields have it
+            for field_type in dict.fromkeys(field.get("type") for field in fields):
                 # Check if the field type refers to another entity
                 if field_type in entities:
-                    puml.append(f"{entity_name} --o {field_type} : contains >")
+                    w(f"{entity_name} --o {field_type} : contains >\n")
         
         # Add relationships between repositories and entities
-        puml.append("' Repository-Entity relationships")
+        w("' Repository-Entity relationships\n")
         for repo_name in repositories:
-            # Try to determine the entity from repository name
-            for entity_name in entities:
-                if entity_name in repo_name:
-                    puml.append(f"{repo_name} ..> {entity_name} : manages >")
+            # Determine the entity from the repository name: <Entity>Repository
+            # or <Entity>Dao, else the first entity named within it
+            entity_name = repo_name.removesuffix("Repository").removesuffix("Dao")
+            if entity_name not in entities:
+                entity_name = next((name for name in entities if name in repo_name), None)
+            if entity_name:
+                w(f"{repo_name} ..> {entity_name} : manages >\n")
         
         # Add relationships between services and repositories
-        puml.append("' Service-Repository relationships")
+        w("' Service-Repository relationships\n")
         service_repo_mappings = architecture_data.get("architecture", {}).get("service_repository", {})
         for service, repos in service_repo_mappings.items():
-            for repo in repos:
-                puml.append(f"{service} --> {repo} : uses >")
+            for repo in dict.fromkeys(repos):
+                w(f"{service} --> {repo} : uses >\n")
                 
         # For services without explicit mappings, try to infer based on names
+        repo_stems = [(repo_name, repo_name.replace("Repository", "")) for repo_name in repositories]
         for service_name in services:
             if service_name not in service_repo_mappings:
-                for repo_name in repositories:
-                    if repo_name.replace("Repository", "") in service_name:
-                        puml.append(f"{service_name} --> {repo_name} : likely uses >")
+                for repo_name, repo_stem in repo_stems:
+                    if repo_stem in service_name:
+                        w(f"{service_name} --> {repo_name} : likely uses >\n")
         
         # Add relationships between controllers and services
-        puml.append("' Controller-Service relationships")
+        w("' Controller-Service relationships\n")
         controller_service_mappings = architecture_data.get("architecture", {}).get("controller_service", {})
         for controller, service_list in controller_service_mappings.items():
-            for service in service_list:
-                puml.append(f"{controller} --> {service} : calls >")
+            for service in dict.fromkeys(service_list):
+                w(f"{controller} --> {service} : calls >\n")
                 
         # For controllers without explicit mappings, infer based on names or endpoint data
-        for controller_name, controller_data in controllers.items():
+        for controller_name in controllers:
             if controller_name not in controller_service_mappings:
                 # Try to find related services from the endpoints' service calls
                 service_called = set()
-                for endpoint in endpoints:
-                    if endpoint.get("controller") == controller_name:
-                        for service_call in endpoint.get("service_calls", []):
-                            service = service_call.get("service", "")
-                            if service and service in services:
-                                service_called.add(service)
+                for endpoint in endpoints_by_controller[controller_name]:
+                    for service_call in endpoint.get("service_calls", ()):
+                        service = service_call.get("service", "")
+                        if service and service in services:
+                            service_called.add(service)
                                 
                 # Add the relationships
                 for service in service_called:
-                    puml.append(f"{controller_name} --> {service} : calls >")
+                    w(f"{controller_name} --> {service} : calls >\n")
                     
                 # If no service calls found, try to infer based on name
                 if not service_called:
                     service_suffix = controller_name.replace("Controller", "Service")
                     if service_suffix in services:
-                        puml.append(f"{controller_name} --> {service_suffix} : likely calls >")
+                        w(f"{controller_name} --> {service_suffix} : likely calls >\n")
         
         # Add legend
-        puml.append("legend right")
-        puml.append("  Entity: Database entity/model class")
-        puml.append("  Repository: Data access interface")
-        puml.append("  Service: Business logic component")
-        puml.append("  Controller: REST endpoint handler")
-        puml.append("  ")
-        puml.append("  Relationship types:")
-        puml.append("  --o : Entity contains/references another entity")
-        puml.append("  ..> : Repository manages an entity")
-        puml.append("  --> : Service uses repository / Controller calls service")
-        puml.append("endlegend")
-        
-        puml.append("@enduml")
-        return "\n".join(puml)
+        w(_CLASS_DIAGRAM_FOOTER)
+    
+    def generate_diagrams(self, diagram_types: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate several diagrams from a single parse of the repository.
+        
+        Args:
+            diagram_types: Diagram types to generate, all of DIAGRAM_TYPES when not given
+            
+        Returns:
+            Dictionary mapping each diagram type to its generate_diagram result
+        """
+        if diagram_types is None:
+            diagram_types = self.DIAGRAM_TYPES
+        return {diagram_type: self.generate_diagram(diagram_type) for diagram_type in diagram_types}
     
     def generate_diagram(self, diagram_type: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Generate diagram of the specified type using PlantUML."""
+        """
+        Generate diagram of the specified type using PlantUML.
+        
+        The repository is parsed on the first call only; later calls on the same
+        renderer, for any diagram type, reuse the parsed data. A diagram rendered
+        from the repository's data is kept and returned again unless rendering it failed.
+        Unsupported diagram types are rejected before any data is loaded.
+        """
+        if diagram_type not in self.DIAGRAM_TYPES:
+            return {
+                "status": "error",
+                "message": f"Unsupported diagram type: {diagram_type}",
+                "puml_source": "",
+                "diagram_url": None
+            }
+        
+        if data is None:
+            result = self._diagrams.get(diagram_type)
+            if result is None:
+                result = self._render_diagram(diagram_type)
+                if result["status"] != "error":
+                    self._diagrams[diagram_type] = result
+            return result
+        return self._render_diagram(diagram_type, data)
+    
+    def _render_diagram(self, diagram_type: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Render one diagram of a supported type, loading the repository data it needs when data is not given."""
         
         # Get appropriate data based on the diagram type if not provided
         if data is None:
             if diagram_type == "use-case":
-                from ..services.feature_builder import FeatureBuilder
-                feature_builder = FeatureBuilder()
-                data = feature_builder.extract_feature_files(self.repo_path)
+                data = self._get_feature_data()
                 
-            elif diagram_type in ["interaction", "comprehensive-interaction", "class", "comprehensive-use-case"]:
-                from ..services.endpoint_parser import EndpointParser
-                endpoint_parser = EndpointParser()
-                data = endpoint_parser.parse_endpoints(self.repo_path)
+            else:
+                data = self._get_endpoint_data()
                 
                 # Log the structure of the data to help with debugging
                 logger.debug(f"Data structure for {diagram_type} diagram: {type(data)}")
@@ -818,7 +1077,6 @@ class DiagramRenderer:
                     logger.debug(f"Keys in data: {list(data.keys())}")
         
         # Generate appropriate diagram
-        puml_source = ""
         if diagram_type == "use-case":
             puml_source = self.generate_use_case_diagram(data)
         elif diagram_type == "comprehensive-use-case":
@@ -832,25 +1090,12 @@ class DiagramRenderer:
                 puml_source = self.generate_interaction_diagram([])
         elif diagram_type == "comprehensive-interaction":
             puml_source = self.generate_comprehensive_interaction_diagram(data)
-        elif diagram_type == "class":
-            puml_source = self.generate_class_diagram(data)
         else:
-            return {
-                "status": "error",
-                "message": f"Unsupported diagram type: {diagram_type}",
-                "puml_source": "",
-                "diagram_url": None
-            }
+            puml_source = self.generate_class_diagram(data)
         
         try:
-            # Try to import plantuml
-            import plantuml
-            
-            # Create a PlantUML server instance
-            server = plantuml.PlantUML(url='http://www.plantuml.com/plantuml/img/')
-            
-            # Generate the diagram
-            diagram_url = server.get_url(puml_source)
+            # Encode the source into a PlantUML server URL
+            diagram_url = plantuml_url(puml_source)
             
             return {
                 "status": "success",
@@ -859,15 +1104,6 @@ class DiagramRenderer:
                 "diagram_url": diagram_url
             }
             
-        except ImportError as e:
-            # Handle missing plantuml package
-            logger.warning(f"PlantUML package not installed: {str(e)}")
-            return {
-                "status": "warning",
-                "message": f"PlantUML package not installed: {str(e)}. Install with: pip install plantuml six",
-                "puml_source": puml_source,
-                "diagram_url": None
-            }
         except Exception as e:
             # Handle other errors
             logger.error(f"Error generating diagram: {str(e)}")
@@ -1,11 +1,58 @@
 import os
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Threads used to read source files; reading is I/O bound and releases the GIL
+_READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Regular expressions used on every Java file, compiled once per process.
+_MAPPING_SUFFIX = r'"([^"]*)"[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\('
+_FALLBACK_MAPPING_SUFFIX = r'"([^"]*)"[^)]*\)[^{]*?public\s+\w+(?:<[^>]*>)?\s+(\w+)\s*\('
+_REQUEST_MAPPING_PREFIX = r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*method\s*=\s*RequestMethod\.'
+_REQUEST_MAPPING_SUFFIX = r'[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\('
+
+_MAPPING_PATTERNS = [
+    (re.compile(r'@GetMapping\s*\(\s*(?:value\s*=\s*)?' + _MAPPING_SUFFIX, re.DOTALL), 'GET'),
+    (re.compile(r'@PostMapping\s*\(\s*(?:value\s*=\s*)?' + _MAPPING_SUFFIX, re.DOTALL), 'POST'),
+    (re.compile(r'@PutMapping\s*\(\s*(?:value\s*=\s*)?' + _MAPPING_SUFFIX, re.DOTALL), 'PUT'),
+    (re.compile(r'@DeleteMapping\s*\(\s*(?:value\s*=\s*)?' + _MAPPING_SUFFIX, re.DOTALL), 'DELETE'),
+    (re.compile(_REQUEST_MAPPING_PREFIX + 'GET' + _REQUEST_MAPPING_SUFFIX, re.DOTALL), 'GET'),
+    (re.compile(_REQUEST_MAPPING_PREFIX + 'POST' + _REQUEST_MAPPING_SUFFIX, re.DOTALL), 'POST'),
+    (re.compile(_REQUEST_MAPPING_PREFIX + 'PUT' + _REQUEST_MAPPING_SUFFIX, re.DOTALL), 'PUT'),
+    (re.compile(_REQUEST_MAPPING_PREFIX + 'DELETE' + _REQUEST_MAPPING_SUFFIX, re.DOTALL), 'DELETE'),
+]
+
+# Fallback patterns for methods with no specific return type or with generics
+_FALLBACK_MAPPING_PATTERNS = [
+    (re.compile(r'@GetMapping\s*\(\s*(?:value\s*=\s*)?' + _FALLBACK_MAPPING_SUFFIX, re.DOTALL), 'GET'),
+    (re.compile(r'@PostMapping\s*\(\s*(?:value\s*=\s*)?' + _FALLBACK_MAPPING_SUFFIX, re.DOTALL), 'POST'),
+    (re.compile(r'@PutMapping\s*\(\s*(?:value\s*=\s*)?' + _FALLBACK_MAPPING_SUFFIX, re.DOTALL), 'PUT'),
+    (re.compile(r'@DeleteMapping\s*\(\s*(?:value\s*=\s*)?' + _FALLBACK_MAPPING_SUFFIX, re.DOTALL), 'DELETE'),
+]
+
+_BASE_PATH_RE = re.compile(r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"')
+_SERVICE_METHOD_RE = re.compile(r'(?:public|private|protected)\s+(?:[\w<>[\],\s]+)\s+(\w+)\s*\([^)]*\)\s*(?:throws\s+[\w,\s]+\s*)?\{', re.DOTALL)
+_AUTOWIRED_FIELD_RE = re.compile(r'@Autowired\s+(?:private|protected|public)?\s+(\w+)\s+(\w+);')
+_REPOSITORY_ENTITY_RE = re.compile(r'(?:interface|class)\s+\w+\s+extends\s+\w+Repository<(\w+),')
+_REPOSITORY_METHOD_RE = re.compile(r'(?:public|private|protected)?\s+(?:[\w<>[\],\s]+)\s+(\w+)\s*\([^)]*\)', re.DOTALL)
+_TABLE_NAME_RE = re.compile(r'@Table\s*\(\s*name\s*=\s*"([^"]+)"')
+_ENTITY_FIELD_RE = re.compile(r'(?:@Column\s*\([^)]*\)\s*)?(?:private|protected|public)\s+([\w<>[\],\s]+)\s+(\w+);')
+_RELATIONSHIP_PATTERNS = [
+    (re.compile(r'@OneToMany\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)<(\w+)>', re.DOTALL), 'OneToMany'),
+    (re.compile(r'@ManyToOne\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)', re.DOTALL), 'ManyToOne'),
+    (re.compile(r'@OneToOne\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)', re.DOTALL), 'OneToOne'),
+    (re.compile(r'@ManyToMany\s*\([^)]*\)\s*(?:private|protected|public)\s+\w+<(\w+)>', re.DOTALL), 'ManyToMany')
+]
+_SERVICE_CALL_RE = re.compile(r'(\w+)Service\.(\w+)\(')
+_REPOSITORY_CALL_RE = re.compile(r'(\w+)Repository\.(\w+)\(')
+_CLASS_NAME_RE = re.compile(r'(?:public\s+|private\s+|protected\s+)?(?:abstract\s+)?class\s+(\w+)')
+_INTERFACE_NAME_RE = re.compile(r'(?:public\s+|private\s+|protected\s+)?interface\s+(\w+)')
+
 class EndpointParser:
     """Service for parsing REST controllers and endpoint methods in Spring Boot projects."""
     
@@ -51,12 +98,21 @@ class EndpointParser:
         r'@Table\b'
     ]
     
+    # Each annotation list above as a single compiled alternation, so a file
+    # is scanned once per class type instead of once per annotation
+    _CONTROLLER_RE = re.compile('|'.join(CONTROLLER_ANNOTATIONS))
+    _SERVICE_RE = re.compile('|'.join(SERVICE_ANNOTATIONS))
+    _REPOSITORY_RE = re.compile('|'.join(REPOSITORY_ANNOTATIONS))
+    _ENTITY_RE = re.compile('|'.join(ENTITY_ANNOTATIONS))
+    
     def __init__(self):
         self.services = {}
         self.repositories = {}
         self.entities = {}
         self.service_repo_mappings = {}
         self.controller_service_mappings = {}
+        self._sources: Dict[Path, Optional[str]] = {}
+        self._class_names: Dict[Path, Optional[str]] = {}
     
     def parse_endpoints(self, repo_path: str) -> Dict[str, Any]:
         """
@@ -91,6 +147,10 @@ class EndpointParser:
         self.entities = {}
         self.service_repo_mappings = {}
         self.controller_service_mappings = {}
+        self._class_names = {}
+        
+        # Read every file once up front; all passes below reuse the text
+        self._sources = self._load_sources(java_files)
         
         endpoints = []
         
@@ -126,6 +186,10 @@ class EndpointParser:
         # Add service and repository info to endpoints where possible
         self._enrich_endpoints_with_dependencies(endpoints)
         
+        # Release the file contents once parsing is complete
+        self._sources = {}
+        self._class_names = {}
+        
         return {
             "endpoints": endpoints,
             "services": self.services,
@@ -166,16 +230,35 @@ class EndpointParser:
         
         return java_files
     
-    def _identify_class_type(self, file_path: Path) -> None:
-        """Identify the type of class in the file: controller, service, repository, or entity."""
+    def _load_sources(self, java_files: List[Path]) -> Dict[Path, Optional[str]]:
+        """Read all Java files concurrently, keyed by path."""
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+            return dict(zip(java_files, executor.map(self._read_java_file, java_files)))
+    
+    def _read_java_file(self, file_path: Path) -> Optional[str]:
+        """Read a Java file, falling back to latin-1 for non-UTF-8 sources."""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except UnicodeDecodeError:
+                logger.warning(f"UnicodeDecodeError with utf-8, trying latin-1 for file: {file_path}")
+                with open(file_path, 'r', encoding='latin-1') as f:
+                    return f.read()
         except Exception as e:
             logger.error(f"Failed to read file {file_path}: {e}")
+            return None
+    
+    def _read_source(self, file_path: Path) -> Optional[str]:
+        """Return the contents of a Java file, from the per-parse cache when loaded."""
+        if file_path in self._sources:
+            return self._sources[file_path]
+        return self._read_java_file(file_path)
+    
+    def _identify_class_type(self, file_path: Path) -> None:
+        """Identify the type of class in the file: controller, service, repository, or entity."""
+        content = self._read_source(file_path)
+        if content is None:
             return
         
         class_name = self._extract_class_name(file_path)
@@ -183,62 +266,46 @@ class EndpointParser:
             return
         
         # Check if controller
-        for pattern in self.CONTROLLER_ANNOTATIONS:
-            if re.search(pattern, content):
-                logger.info(f"Identified controller: {class_name}")
-                return
+        if self._CONTROLLER_RE.search(content):
+            logger.info(f"Identified controller: {class_name}")
+            return
         
         # Check if service
-        for pattern in self.SERVICE_ANNOTATIONS:
-            if re.search(pattern, content):
-                logger.info(f"Identified service: {class_name}")
-                self.services[class_name] = {"methods": [], "file_path": str(file_path)}
-                return
+        if self._SERVICE_RE.search(content):
+            logger.info(f"Identified service: {class_name}")
+            self.services[class_name] = {"methods": [], "file_path": str(file_path)}
+            return
         
         # Check if repository
-        for pattern in self.REPOSITORY_ANNOTATIONS:
-            if re.search(pattern, content):
-                logger.info(f"Identified repository: {class_name}")
-                self.repositories[class_name] = {"methods": [], "file_path": str(file_path)}
-                return
+        if self._REPOSITORY_RE.search(content):
+            logger.info(f"Identified repository: {class_name}")
+            self.repositories[class_name] = {"methods": [], "file_path": str(file_path)}
+            return
         
         # Check if entity
-        for pattern in self.ENTITY_ANNOTATIONS:
-            if re.search(pattern, content):
-                logger.info(f"Identified entity: {class_name}")
-                self.entities[class_name] = {"fields": [], "file_path": str(file_path)}
-                return
+        if self._ENTITY_RE.search(content):
+            logger.info(f"Identified entity: {class_name}")
+            self.entities[class_name] = {"fields": [], "file_path": str(file_path)}
+            return
     
     def _parse_file(self, file_path: Path) -> List[Dict[str, Any]]:
         """Parse a Java file to extract controller and endpoint information."""
         logger.info(f"Parsing file: {file_path}")
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            logger.warning(f"UnicodeDecodeError with utf-8, trying latin-1 for file: {file_path}")
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            logger.error(f"Failed to read file {file_path}: {e}")
+        content = self._read_source(file_path)
+        if content is None:
             return []
         
         # Check if this file contains a REST controller
-        is_controller = False
-        for pattern in self.CONTROLLER_ANNOTATIONS:
-            if re.search(pattern, content):
-                is_controller = True
-                controller_name = self._extract_class_name(file_path)
-                logger.info(f"Found controller: {controller_name}")
-                break
-                
-        if not is_controller:
+        if not self._CONTROLLER_RE.search(content):
             return []
+        
+        controller_name = self._extract_class_name(file_path)
+        logger.info(f"Found controller: {controller_name}")
             
         # Find controller base path if it exists
         base_path = ""
-        request_mapping_match = re.search(r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"', content)
+        request_mapping_match = _BASE_PATH_RE.search(content)
         if request_mapping_match:
             base_path = request_mapping_match.group(1).strip('/')
             logger.info(f"Controller base path: {base_path}")
@@ -246,29 +313,9 @@ class EndpointParser:
         # Look for endpoints using Spring mapping annotations combined with method declarations
         endpoints = []
         
-        # Define mapping patterns to search for
-        mapping_patterns = [
-            (r'@GetMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'GET'),
-            (r'@PostMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'POST'),
-            (r'@PutMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'PUT'),
-            (r'@DeleteMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'DELETE'),
-            (r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*method\s*=\s*RequestMethod\.GET[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'GET'),
-            (r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*method\s*=\s*RequestMethod\.POST[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'POST'),
-            (r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*method\s*=\s*RequestMethod\.PUT[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'PUT'),
-            (r'@RequestMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*method\s*=\s*RequestMethod\.DELETE[^)]*\)[^{]*?public\s+(?:ResponseEntity|[\w<>]+)\s+(\w+)\s*\(', 'DELETE'),
-        ]
-        
-        # Fallback pattern for methods with no specific return type or with generics
-        fallback_mapping_patterns = [
-            (r'@GetMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+\w+(?:<[^>]*>)?\s+(\w+)\s*\(', 'GET'),
-            (r'@PostMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+\w+(?:<[^>]*>)?\s+(\w+)\s*\(', 'POST'),
-            (r'@PutMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+\w+(?:<[^>]*>)?\s+(\w+)\s*\(', 'PUT'),
-            (r'@DeleteMapping\s*\(\s*(?:value\s*=\s*)?"([^"]*)"[^)]*\)[^{]*?public\s+\w+(?:<[^>]*>)?\s+(\w+)\s*\(', 'DELETE'),
-        ]
-        
         # Extract endpoint methods
-        for pattern, http_method in mapping_patterns:
-            for match in re.finditer(pattern, content, re.DOTALL):
+        for pattern, http_method in _MAPPING_PATTERNS:
+            for match in pattern.finditer(content):
                 path = match.group(1)
                 method_name = match.group(2)
                 
@@ -307,8 +354,8 @@ class EndpointParser:
         
         # Try fallback patterns if no endpoints found
         if not endpoints:
-            for pattern, http_method in fallback_mapping_patterns:
-                for match in re.finditer(pattern, content, re.DOTALL):
+            for pattern, http_method in _FALLBACK_MAPPING_PATTERNS:
+                for match in pattern.finditer(content):
                     path = match.group(1)
                     method_name = match.group(2)
                     
@@ -349,19 +396,12 @@ class EndpointParser:
         if not class_name or class_name not in self.services:
             return
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            logger.error(f"Failed to read file {file_path}: {e}")
+        content = self._read_source(file_path)
+        if content is None:
             return
         
         # Extract methods
-        method_pattern = r'(?:public|private|protected)\s+(?:[\w<>[\],\s]+)\s+(\w+)\s*\([^)]*\)\s*(?:throws\s+[\w,\s]+\s*)?\{'
-        for match in re.finditer(method_pattern, content, re.DOTALL):
+        for match in _SERVICE_METHOD_RE.finditer(content):
             method_name = match.group(1)
             method_start = match.end()
             method_block = self._extract_method_block(content, method_start)
@@ -376,8 +416,7 @@ class EndpointParser:
             })
         
         # Extract repository dependencies from fields
-        field_pattern = r'@Autowired\s+(?:private|protected|public)?\s+(\w+)\s+(\w+);'
-        for match in re.finditer(field_pattern, content):
+        for match in _AUTOWIRED_FIELD_RE.finditer(content):
             field_type = match.group(1)
             field_name = match.group(2)
             
@@ -393,27 +432,19 @@ class EndpointParser:
         if not class_name or class_name not in self.repositories:
             return
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            logger.error(f"Failed to read file {file_path}: {e}")
+        content = self._read_source(file_path)
+        if content is None:
             return
         
         # Extract entity types from interface/class declaration
-        entity_pattern = r'(?:interface|class)\s+\w+\s+extends\s+\w+Repository<(\w+),'
-        entity_match = re.search(entity_pattern, content)
+        entity_match = _REPOSITORY_ENTITY_RE.search(content)
         entity_type = None
         if entity_match:
             entity_type = entity_match.group(1)
             self.repositories[class_name]["entity_type"] = entity_type
         
         # Extract methods
-        method_pattern = r'(?:public|private|protected)?\s+(?:[\w<>[\],\s]+)\s+(\w+)\s*\([^)]*\)'
-        for match in re.finditer(method_pattern, content, re.DOTALL):
+        for match in _REPOSITORY_METHOD_RE.finditer(content):
             method_name = match.group(1)
             self.repositories[class_name]["methods"].append({
                 "name": method_name,
@@ -426,25 +457,17 @@ class EndpointParser:
         if not class_name or class_name not in self.entities:
             return
         
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            logger.error(f"Failed to read file {file_path}: {e}")
+        content = self._read_source(file_path)
+        if content is None:
             return
         
         # Extract table name if available
-        table_pattern = r'@Table\s*\(\s*name\s*=\s*"([^"]+)"'
-        table_match = re.search(table_pattern, content)
+        table_match = _TABLE_NAME_RE.search(content)
         if table_match:
             self.entities[class_name]["table_name"] = table_match.group(1)
         
         # Extract fields
-        field_pattern = r'(?:@Column\s*\([^)]*\)\s*)?(?:private|protected|public)\s+([\w<>[\],\s]+)\s+(\w+);'
-        for match in re.finditer(field_pattern, content):
+        for match in _ENTITY_FIELD_RE.finditer(content):
             field_type = match.group(1).strip()
             field_name = match.group(2)
             
@@ -454,18 +477,11 @@ class EndpointParser:
             })
         
         # Extract relationships
-        relationship_patterns = [
-            (r'@OneToMany\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)<(\w+)>', 'OneToMany'),
-            (r'@ManyToOne\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)', 'ManyToOne'),
-            (r'@OneToOne\s*\([^)]*\)\s*(?:private|protected|public)\s+(\w+)', 'OneToOne'),
-            (r'@ManyToMany\s*\([^)]*\)\s*(?:private|protected|public)\s+\w+<(\w+)>', 'ManyToMany')
-        ]
-        
         if "relationships" not in self.entities[class_name]:
             self.entities[class_name]["relationships"] = []
         
-        for pattern, rel_type in relationship_patterns:
-            for match in re.finditer(pattern, content, re.DOTALL):
+        for pattern, rel_type in _RELATIONSHIP_PATTERNS:
+            for match in pattern.finditer(content):
                 if rel_type in ['OneToMany', 'ManyToMany']:
                     target_entity = match.group(2)
                 else:
@@ -478,14 +494,8 @@ class EndpointParser:
     
     def _identify_relationships(self, file_path: Path) -> None:
         """Identify relationships between controllers, services, repositories, and entities."""
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        except Exception as e:
-            logger.error(f"Failed to read file {file_path}: {e}")
+        content = self._read_source(file_path)
+        if content is None:
             return
         
         class_name = self._extract_class_name(file_path)
@@ -493,19 +503,17 @@ class EndpointParser:
             return
         
         # Check for controller-service relationships
-        for pattern in self.CONTROLLER_ANNOTATIONS:
-            if re.search(pattern, content):
-                # Extract service dependencies from fields
-                field_pattern = r'@Autowired\s+(?:private|protected|public)?\s+(\w+)\s+(\w+);'
-                for match in re.finditer(field_pattern, content):
-                    field_type = match.group(1)
-                    field_name = match.group(2)
-                    
-                    # Check if field is a service
-                    if field_type in self.services or field_type.endswith("Service"):
-                        if class_name not in self.controller_service_mappings:
-                            self.controller_service_mappings[class_name] = []
-                        self.controller_service_mappings[class_name].append(field_type)
+        if self._CONTROLLER_RE.search(content):
+            # Extract service dependencies from fields
+            for match in _AUTOWIRED_FIELD_RE.finditer(content):
+                field_type = match.group(1)
+                field_name = match.group(2)
+                
+                # Check if field is a service
+                if field_type in self.services or field_type.endswith("Service"):
+                    if class_name not in self.controller_service_mappings:
+                        self.controller_service_mappings[class_name] = []
+                    self.controller_service_mappings[class_name].append(field_type)
     
     def _extract_method_block(self, content: str, method_start: int) -> str:
         """Extract the complete method implementation block starting from the opening brace."""
@@ -527,10 +535,8 @@ class EndpointParser:
         """Extract service method calls from a method implementation."""
         service_calls = []
         
-        # Pattern to match service method calls like "userService.findById(123)"
-        service_call_pattern = r'(\w+)Service\.(\w+)\('
-        
-        for match in re.finditer(service_call_pattern, method_block):
+        # Match service method calls like "userService.findById(123)"
+        for match in _SERVICE_CALL_RE.finditer(method_block):
             service_prefix = match.group(1)
             method_name = match.group(2)
             
@@ -546,10 +552,8 @@ class EndpointParser:
         """Extract repository method calls from a method implementation."""
         repo_calls = []
         
-        # Pattern to match repository method calls like "userRepository.findById(123)"
-        repo_call_pattern = r'(\w+)Repository\.(\w+)\('
-        
-        for match in re.finditer(repo_call_pattern, method_block):
+        # Match repository method calls like "userRepository.findById(123)"
+        for match in _REPOSITORY_CALL_RE.finditer(method_block):
             repo_prefix = match.group(1)
             method_name = match.group(2)
             
@@ -583,21 +587,16 @@ class EndpointParser:
         """
         Extract the primary class name from a Java file.
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
-        
-        # Extract class name using regex
-        class_match = re.search(r'(?:public\s+|private\s+|protected\s+)?(?:abstract\s+)?class\s+(\w+)', content)
-        if class_match:
-            return class_match.group(1)
-        
-        # Try to extract interface name
-        interface_match = re.search(r'(?:public\s+|private\s+|protected\s+)?interface\s+(\w+)', content)
-        if interface_match:
-            return interface_match.group(1)
-        
-        return None 
\ No newline at end of file
+        if file_path in self._class_names:
+            return self._class_names[file_path]
+        
+        content = self._read_source(file_path)
+        class_name = None
+        if content is not None:
+            # Extract class name using regex, then try the interface name
+            name_match = _CLASS_NAME_RE.search(content) or _INTERFACE_NAME_RE.search(content)
+            if name_match:
+                class_name = name_match.group(1)
+        
+        self._class_names[file_path] = class_name
+        return class_name 
\ No newline at end of file
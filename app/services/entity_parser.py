@@ -1,11 +1,26 @@
 import os
 import logging
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Threads used to read source files; reading is I/O bound and releases the GIL
+_READ_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Regular expressions used on every Java file, compiled once per process
+_ENTITY_ANNOTATION_RE = re.compile(r'@Entity\b')
+_CLASS_DECLARATION_RE = re.compile(r'(?:public|private|protected)?\s+(?:abstract\s+)?class\s+(\w+)')
+_PACKAGE_RE = re.compile(r'package\s+([\w.]+);')
+_FIELD_DECLARATION_RE = re.compile(r'(?:private|public|protected)?\s+(?:final\s+)?(\w+(?:<[^>]+>)?)\s+(\w+)')
+_COLUMN_NAME_RE = re.compile(r'@Column\s*\(\s*name\s*=\s*["\']([^"\']+)["\']')
+_COLUMN_FIELD_RE = re.compile(r'(?:private|public|protected)?\s+(?:final\s+)?(?:\w+(?:<[^>]+>)?)\s+(\w+)')
+_IMPLEMENTS_RE = re.compile(r'implements\s+([\w.,\s]+)(?:\{|$)')
+_EXTENDS_RE = re.compile(r'extends\s+(\w+)')
+
 class EntityRelationship:
     def __init__(self, field_name: str, field_type: str, relationship_type: str, target_entity: str):
         self.field_name = field_name
@@ -32,6 +47,9 @@ class EntityParser:
         self.repo_path = repo_path
         self.entities = {}
         self.count = 0
+        # parse_entities walks the repository only once per parser
+        self._parsed = False
+        self._parse_lock = threading.Lock()
         
         # Common database-related annotations
         self.db_annotations = [
@@ -44,9 +62,21 @@ class EntityParser:
         """
         Parse all entities in the repository.
         
+        The repository is parsed on the first call only; later calls return the
+        same entity data, which callers must not modify.
+        
         Returns:
             Dictionary containing all entities and their details
         """
+        with self._parse_lock:
+            if not self._parsed:
+                self._parse_repository()
+                self._parsed = True
+        
+        return self.to_dict()
+    
+    def _parse_repository(self) -> None:
+        """Find and parse every Java file in the repository."""
         logger.info(f"Parsing entities in repository: {self.repo_path}")
         
         # Find all Java files
@@ -58,41 +88,50 @@ class EntityParser:
         
         logger.info(f"Found {len(java_files)} Java files to analyze")
         
-        # Parse each Java file to find entities
-        for java_file in java_files:
-            try:
-                self._parse_file(java_file)
-            except Exception as e:
-                logger.error(f"Error parsing file {java_file}: {str(e)}")
+        # Read the files concurrently and parse each one as its contents arrive
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as executor:
+            for java_file, content in zip(java_files, executor.map(self._read_file, java_files)):
+                if content is None:
+                    continue
+                try:
+                    self._parse_file(java_file, content)
+                except Exception as e:
+                    logger.error(f"Error parsing file {java_file}: {str(e)}")
         
         logger.info(f"Found {self.count} entities")
-        
-        # Return the results
-        return {
-            "entities": self.entities,
-            "count": self.count
-        }
     
-    def _parse_file(self, file_path: str) -> None:
+    def _read_file(self, file_path: str) -> Optional[str]:
+        """Read a Java file, falling back to latin-1 for non-UTF-8 sources."""
+        try:
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    return f.read()
+            except UnicodeDecodeError:
+                with open(file_path, 'r', encoding='latin-1') as f:
+                    return f.read()
+        except Exception as e:
+            logger.error(f"Error reading file {file_path}: {str(e)}")
+            return None
+    
+    def _parse_file(self, file_path: str, content: Optional[str] = None) -> None:
         """
         Parse a Java file to extract entity information.
         
         Args:
             file_path: Path to the Java file
+            content: Contents of the file, read from file_path when not given
         """
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except UnicodeDecodeError:
-            with open(file_path, 'r', encoding='latin-1') as f:
-                content = f.read()
+        if content is None:
+            content = self._read_file(file_path)
+            if content is None:
+                return
         
         # Check if this is an entity class
         is_entity = False
         has_db_annotations = False
         
         # Check for Entity annotation
-        if re.search(r'@Entity\b', content):
+        if _ENTITY_ANNOTATION_RE.search(content):
             is_entity = True
         
         # If not explicitly an entity, check for other database-related annotations
@@ -107,25 +146,26 @@ class EntityParser:
             return
         
         # Extract class name
-        class_match = re.search(r'(?:public|private|protected)?\s+(?:abstract\s+)?class\s+(\w+)', content)
+        class_match = _CLASS_DECLARATION_RE.search(content)
         if not class_match:
             return
         
         class_name = class_match.group(1)
         
         # Extract package name
-        package_match = re.search(r'package\s+([\w.]+);', content)
+        package_match = _PACKAGE_RE.search(content)
         package = package_match.group(1) if package_match else "unknown"
         
         # Extract annotations for the class
         class_annotations = []
         lines = content.split('\n')
         in_class_decl = False
+        class_decl_re = re.compile(r'class\s+' + class_name)
         for line in lines:
             line = line.strip()
             
             # If we found the class declaration, stop collecting annotations
-            if re.search(r'class\s+' + class_name, line):
+            if class_decl_re.search(line):
                 in_class_decl = True
                 continue
             
@@ -175,8 +215,9 @@ class EntityParser:
         
         # Find the class declaration
         class_index = -1
+        class_decl_re = re.compile(r'class\s+' + class_name)
         for i, line in enumerate(lines):
-            if re.search(r'class\s+' + class_name, line):
+            if class_decl_re.search(line):
                 class_index = i
                 break
         
@@ -198,7 +239,7 @@ class EntityParser:
                 continue
             
             # Check for field declaration
-            field_match = re.search(r'(?:private|public|protected)?\s+(?:final\s+)?(\w+(?:<[^>]+>)?)\s+(\w+)', line)
+            field_match = _FIELD_DECLARATION_RE.search(line)
             if field_match:
                 field_type = field_match.group(1)
                 field_name = field_match.group(2)
@@ -225,9 +266,8 @@ class EntityParser:
         """
         mappings = {}
         
-        # Pattern to match @Column annotations
-        column_pattern = r'@Column\s*\(\s*name\s*=\s*["\']([^"\']+)["\']'
-        column_matches = re.finditer(column_pattern, content)
+        # Match @Column annotations
+        column_matches = _COLUMN_NAME_RE.finditer(content)
         
         for match in column_matches:
             column_name = match.group(1)
@@ -235,7 +275,7 @@ class EntityParser:
             # Find the field declaration that follows this annotation
             field_start = match.end()
             field_text = content[field_start:field_start + 200]  # Look ahead a bit
-            field_match = re.search(r'(?:private|public|protected)?\s+(?:final\s+)?(?:\w+(?:<[^>]+>)?)\s+(\w+)', field_text)
+            field_match = _COLUMN_FIELD_RE.search(field_text)
             
             if field_match:
                 field_name = field_match.group(1)
@@ -245,7 +285,7 @@ class EntityParser:
     
     def _extract_implements(self, content: str) -> List[str]:
         """Extract interfaces implemented by the class."""
-        implements_match = re.search(r'implements\s+([\w.,\s]+)(?:\{|$)', content)
+        implements_match = _IMPLEMENTS_RE.search(content)
         if implements_match:
             implements_str = implements_match.group(1)
             return [impl.strip() for impl in implements_str.split(',')]
@@ -253,7 +293,7 @@ class EntityParser:
     
     def _extract_extends(self, content: str) -> Optional[str]:
         """Extract parent class."""
-        extends_match = re.search(r'extends\s+(\w+)', content)
+        extends_match = _EXTENDS_RE.search(content)
         if extends_match:
             return extends_match.group(1)
         return None
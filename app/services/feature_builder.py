@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any, Tuple
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 import os
 import re
 import io
@@ -8,6 +8,29 @@ from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+class _ZipChunkBuffer(io.RawIOBase):
+    """
+    Write-only, non-seekable sink for zipfile that hands out what has been
+    written so far. Being non-seekable makes zipfile track offsets itself and
+    emit data descriptors, so earlier chunks never need to be revisited.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 class FeatureBuilder:
     """
     Service to generate Gherkin feature files from parsed endpoint data.
@@ -16,12 +39,14 @@ class FeatureBuilder:
     def __init__(self):
         pass
     
-    def extract_feature_files(self, repo_path: str) -> Dict[str, Any]:
+    def extract_feature_files(self, repo_path: str, endpoints_data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Extract feature files data for diagram generation.
         
         Args:
             repo_path: Path to the repository directory
+            endpoints_data: Output of EndpointParser.parse_endpoints for repo_path,
+                parsed here when not given
             
         Returns:
             Dictionary containing feature files data to be used for diagram generation
@@ -29,9 +54,10 @@ class FeatureBuilder:
         logger.info(f"Extracting feature file data from repository: {repo_path}")
         
         # Import endpoint parser to get the endpoints data
-        from .endpoint_parser import EndpointParser
-        endpoint_parser = EndpointParser()
-        endpoints_data = endpoint_parser.parse_endpoints(repo_path)
+        if endpoints_data is None:
+            from .endpoint_parser import EndpointParser
+            endpoint_parser = EndpointParser()
+            endpoints_data = endpoint_parser.parse_endpoints(repo_path)
         
         # Extract the repository name from path
         repo_name = os.path.basename(repo_path)
@@ -89,13 +115,14 @@ class FeatureBuilder:
         
         return features_data
     
-    def generate_feature_files(self, endpoints: List[Dict[str, Any]], repo_name: str) -> List[Dict[str, Any]]:
+    def generate_feature_files(self, endpoints: List[Dict[str, Any]], repo_name: str, preview: bool = True) -> List[Dict[str, Any]]:
         """
         Generate Gherkin feature files for the parsed endpoints.
         
         Args:
             endpoints: List of endpoint dictionaries with controller, method, http_method, and path
             repo_name: Name of the repository for documentation purposes
+            preview: Whether to add a "preview" snippet (the first 5 lines) to each feature file
             
         Returns:
             List of dictionaries with feature file information
@@ -128,12 +155,15 @@ class FeatureBuilder:
             # Create sanitized filename
             filename = self._sanitize_filename(controller) + ".feature"
             
-            feature_files.append({
+            feature_file = {
                 "filename": filename,
                 "content": feature_content,
                 "controller": controller,
                 "endpoint_count": len(ctrl_endpoints)
-            })
+            }
+            if preview:
+                feature_file["preview"] = self._preview(feature_content)
+            feature_files.append(feature_file)
         
         return feature_files
     
@@ -193,6 +223,16 @@ class FeatureBuilder:
         
         return feature_content
     
+    def _preview(self, content: str, line_count: int = 5) -> str:
+        """Return the first line_count lines of content followed by an ellipsis."""
+        # Find the end of the last previewed line instead of splitting the whole file
+        end = -1
+        for _ in range(line_count):
+            end = content.find("\n", end + 1)
+            if end == -1:
+                return content + "..."
+        return content[:end] + "..."
+    
     def _sanitize_filename(self, name: str) -> str:
         """Sanitize a string to be used as a filename."""
         # Remove Controller suffix if present
@@ -222,8 +262,35 @@ class FeatureBuilder:
         # Get the bytes from the in-memory zip file
         zip_bytes = zip_buffer.getvalue()
         
-        # Generate a filename for the zip file
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"{repo_name}_features_{timestamp}.zip"
+        return zip_bytes, self._zip_filename(repo_name)
+    
+    def create_zip_stream(self, feature_files: List[Dict[str, Any]], repo_name: str) -> Tuple[Iterator[bytes], str]:
+        """
+        Create a zip archive of the feature files as a stream of byte chunks.
         
-        return zip_bytes, filename 
\ No newline at end of file
+        Each feature file is compressed and yielded as soon as it is written, so
+        the complete archive is never held in memory.
+        
+        Args:
+            feature_files: List of feature file dictionaries
+            repo_name: Name of the repository
+            
+        Returns:
+            Tuple of (iterator over zip file chunks, filename)
+        """
+        return self._iter_zip_chunks(feature_files), self._zip_filename(repo_name)
+    
+    def _iter_zip_chunks(self, feature_files: List[Dict[str, Any]]) -> Iterator[bytes]:
+        """Yield the zip archive of the feature files one entry at a time."""
+        buffer = _ZipChunkBuffer()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            for feature in feature_files:
+                zip_file.writestr(feature["filename"], feature["content"])
+                yield buffer.drain()
+        # Central directory written on close
+        yield buffer.drain()
+    
+    def _zip_filename(self, repo_name: str) -> str:
+        """Generate a timestamped filename for a feature files zip."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return f"{repo_name}_features_{timestamp}.zip" 
\ No newline at end of file
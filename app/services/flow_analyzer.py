@@ -4,8 +4,6 @@ import re
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Set
 import ast
-import javalang
-import javalang.tree
 
 logger = logging.getLogger(__name__)
 
@@ -33,20 +31,23 @@ class FlowAnalyzer:
         self.class_method_map = {}  # Map of class+method to their call graph
         self.parsed_classes = {}  # Cache of parsed class information
     
-    def analyze_flows(self, repo_path: str) -> List[Dict[str, Any]]:
+    def analyze_flows(self, repo_path: str, architecture_data: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Analyze API endpoint flows in a repository.
         
         Args:
             repo_path: Path to the repository
+            architecture_data: Output of EndpointParser.parse_endpoints for repo_path,
+                parsed here when not given
             
         Returns:
             List of flow data for each endpoint
         """
         # First, scan for controller classes and endpoints
-        from app.services.endpoint_parser import EndpointParser
-        endpoint_parser = EndpointParser()
-        architecture_data = endpoint_parser.parse_endpoints(repo_path)
+        if architecture_data is None:
+            from app.services.endpoint_parser import EndpointParser
+            endpoint_parser = EndpointParser()
+            architecture_data = endpoint_parser.parse_endpoints(repo_path)
         
         # Extract endpoints list from architecture_data if it's a dictionary
         if isinstance(architecture_data, dict) and "endpoints" in architecture_data:
@@ -126,6 +127,33 @@ class FlowAnalyzer:
         # If we need to present a completely flat list for some views, 
         # we can implement that here while still keeping the hierarchy information
     
+    @staticmethod
+    def build_call_graph(calls: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Flatten a nested call tree into a node table with parent indices.
+        
+        Args:
+            calls: Nested calls of a flow entry
+            
+        Returns:
+            Dictionary with a depth-first ordered "nodes" list
+        """
+        nodes = []
+        stack = [(call, -1) for call in reversed(calls or [])]
+        while stack:
+            call, parent = stack.pop()
+            index = len(nodes)
+            nodes.append({
+                "class_name": call.get("class_name", ""),
+                "method": call.get("method", ""),
+                "class_type": call.get("class_type", "unknown"),
+                "parent": parent
+            })
+            nested_calls = call.get("calls")
+            if nested_calls:
+                stack.extend((nested, index) for nested in reversed(nested_calls))
+        return {"nodes": nodes}
+    
     def _determine_class_type_from_name(self, class_name: str) -> str:
         """Determine the type of a class based on its name when detailed info is not available."""
         if 'Controller' in class_name:
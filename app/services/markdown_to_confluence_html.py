@@ -2,7 +2,6 @@ import logging
 import re
 import html
 from typing import Dict, Any, Optional
-from markdown import markdown
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +11,9 @@ class MarkdownToConfluenceConverter:
     @staticmethod
     def convert_markdown_to_html(markdown_text: str) -> str:
         """Convert Markdown to standard HTML."""
+        # Markdown and its extensions are slow to import, so load them on first conversion
+        from markdown import markdown
+        
         try:
             return markdown(markdown_text, extensions=['tables', 'fenced_code', 'codehilite'])
         except Exception as e:
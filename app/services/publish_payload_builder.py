@@ -185,45 +185,38 @@ class PublishPayloadBuilder:
         
         sections_content = {}
         
+        # Several sections need the repository's endpoints; parse them at most once
+        def parsed_endpoints() -> Dict[str, Any]:
+            nonlocal endpoints_data
+            if not endpoints_data:
+                endpoints_data = EndpointParser().parse_endpoints(self.repo_path)
+            return endpoints_data
+        
         # Process each requested section
         for section in selected_sections:
             if section == "api_docs":
-                if not endpoints_data:
-                    parser = EndpointParser()
-                    endpoints_data = parser.parse_endpoints(self.repo_path)
-                
-                sections_content["API Documentation"] = self.get_api_docs_section(endpoints_data)
+                sections_content["API Documentation"] = self.get_api_docs_section(parsed_endpoints())
                 
             elif section == "features":
                 if not features_data:
                     builder = FeatureBuilder()
-                    features_data = builder.extract_feature_files(self.repo_path)
+                    features_data = builder.extract_feature_files(self.repo_path, parsed_endpoints())
                 
                 sections_content["Feature Files"] = self.get_feature_files_section(features_data)
                 
             elif section == "diagrams":
                 if not diagrams_data:
-                    diagrams_data = {}
-                    renderer = DiagramRenderer(self.repo_path)
-                    
-                    # Generate all diagram types including comprehensive versions
-                    diagram_types = [
-                        "use-case", 
-                        "comprehensive-use-case", 
-                        "interaction", 
-                        "comprehensive-interaction", 
-                        "class"
-                    ]
-                    
-                    for diagram_type in diagram_types:
-                        diagrams_data[diagram_type] = renderer.generate_diagram(diagram_type)
+                    # Generate all diagram types including comprehensive versions,
+                    # from one parse of the repository
+                    renderer = DiagramRenderer(self.repo_path, parsed_endpoints)
+                    diagrams_data = renderer.generate_diagrams()
                 
                 sections_content["System Diagrams"] = self.get_diagrams_section(diagrams_data)
                 
             elif section == "flows":
                 if not flows_data:
-                    analyzer = FlowAnalyzer(self.repo_path)
-                    flows_data = analyzer.analyze_flows()
+                    analyzer = FlowAnalyzer()
+                    flows_data = analyzer.analyze_flows(self.repo_path, parsed_endpoints())
                 
                 sections_content["Flow Summaries"] = self.get_flow_section(flows_data)
         
@@ -5,8 +5,6 @@ import tempfile
 import uuid
 import time
 from pathlib import Path
-from git import Repo
-from git.exc import GitCommandError, InvalidGitRepositoryError
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +43,10 @@ class RepoService:
         Returns:
             A dictionary with status information
         """
+        # GitPython is heavy to import (it probes the git binary), so load it on first clone
+        from git import Repo
+        from git.exc import GitCommandError
+        
         repo_name = self.extract_repo_name(repo_url)
         
         # Create a unique directory for this clone attempt to avoid conflicts
@@ -50,6 +50,22 @@ class RoleFilter:
         }
     }
     
+    # Display flags added to every endpoint, per role
+    ENDPOINT_VIEW_FLAGS = {
+        "developer": {"show_details": True, "show_params": True, "show_flows": True},
+        "architect": {"show_details": True, "show_params": False, "show_flows": True},
+        "product_owner": {"show_details": False, "show_params": False, "show_flows": False},
+        "qa": {"show_details": True, "show_params": True, "show_flows": False, "link_to_test_cases": True}
+    }
+    
+    # Display flags added to the entity data, per role
+    ENTITY_VIEW_FLAGS = {
+        "developer": {"show_field_details": True, "show_annotations": True, "show_relationships": True},
+        "architect": {"show_field_details": False, "show_annotations": False, "show_relationships": True},
+        "product_owner": {"show_field_details": False, "show_annotations": False, "show_relationships": False},
+        "qa": {"show_field_details": True, "show_annotations": False, "show_relationships": True}
+    }
+    
     def __init__(self):
         pass
     
@@ -101,34 +117,15 @@ class RoleFilter:
         
         # For now, we don't actually filter out endpoints, just mark them with additional data
         # In a real application, you might want to filter based on authorization, etc.
-        filtered_endpoints = []
+        # The role's flags are looked up once and merged into a copy of each endpoint.
+        view_flags = self.ENDPOINT_VIEW_FLAGS[role]
+        filtered_endpoints = [{**endpoint, **view_flags} for endpoint in endpoints]
         
-        for endpoint in endpoints:
-            endpoint_copy = endpoint.copy()
-            
-            # Add role-specific metadata
-            if role == "developer":
-                endpoint_copy["show_details"] = True
-                endpoint_copy["show_params"] = True
-                endpoint_copy["show_flows"] = True
-            elif role == "architect":
-                endpoint_copy["show_details"] = True
-                endpoint_copy["show_params"] = False
-                endpoint_copy["show_flows"] = True
-            elif role == "product_owner":
-                endpoint_copy["show_details"] = False
-                endpoint_copy["show_params"] = False
-                endpoint_copy["show_flows"] = False
-                # Product owners might want to see a more user-friendly description
+        # Product owners might want to see a more user-friendly description
+        if role == "product_owner":
+            for endpoint_copy in filtered_endpoints:
                 if "description" in endpoint_copy:
                     endpoint_copy["business_description"] = self._convert_to_business_language(endpoint_copy["description"])
-            elif role == "qa":
-                endpoint_copy["show_details"] = True
-                endpoint_copy["show_params"] = True
-                endpoint_copy["show_flows"] = False
-                endpoint_copy["link_to_test_cases"] = True
-            
-            filtered_endpoints.append(endpoint_copy)
         
         return filtered_endpoints
     
@@ -147,32 +144,16 @@ class RoleFilter:
             logger.warning(f"Unknown role: {role}, defaulting to developer")
             role = "developer"
         
-        filtered_entities = entities.copy()
-        
         # Add role-specific flags
-        if role == "developer":
-            filtered_entities["show_field_details"] = True
-            filtered_entities["show_annotations"] = True
-            filtered_entities["show_relationships"] = True
-        elif role == "architect":
-            filtered_entities["show_field_details"] = False
-            filtered_entities["show_annotations"] = False
-            filtered_entities["show_relationships"] = True
-        elif role == "product_owner":
-            filtered_entities["show_field_details"] = False
-            filtered_entities["show_annotations"] = False
-            filtered_entities["show_relationships"] = False
+        filtered_entities = {**entities, **self.ENTITY_VIEW_FLAGS[role]}
+        
+        if role == "product_owner":
             # Simplify entity names to be more business-friendly
             simplified_entities = {}
             for entity_name, entity_data in filtered_entities.get("entities", {}).items():
                 business_name = self._convert_to_business_entity_name(entity_name)
-                entity_data["business_name"] = business_name
-                simplified_entities[entity_name] = entity_data
+                simplified_entities[entity_name] = {**entity_data, "business_name": business_name}
             filtered_entities["entities"] = simplified_entities
-        elif role == "qa":
-            filtered_entities["show_field_details"] = True
-            filtered_entities["show_annotations"] = False
-            filtered_entities["show_relationships"] = True
         
         return filtered_entities
     
@@ -0,0 +1,14 @@
+from app.services.diagram_generator import PLANTUML_SERVER_URL, plantuml_url
+
+
+def test_plantuml_url_matches_plantuml_encoding():
+    # The example from PlantUML's text encoding documentation
+    assert plantuml_url("Bob -> Alice : hello") == PLANTUML_SERVER_URL + "SyfFKj2rKt3CoKnELR1Io4ZDoSa70000"
+
+
+def test_plantuml_url_uses_only_plantuml_alphabet():
+    for source in ("", "@startuml\n@enduml", "A -> B\n" * 7, "Bob -> Alice : héllo"):
+        encoded = plantuml_url(source)[len(PLANTUML_SERVER_URL):]
+        assert len(encoded) % 4 == 0
+        assert "=" not in encoded
+        assert all(c.isascii() and (c.isalnum() or c in "-_") for c in encoded)
@@ -0,0 +1,53 @@
+from app.services.endpoint_parser import EndpointParser
+
+# Every key get_repository_endpoints reads from a parsed endpoint by subscript
+ENDPOINT_KEYS = {"controller", "method", "http_method", "path"}
+
+USER_CONTROLLER = """
+package com.example.demo;
+
+@RestController
+@RequestMapping("/users")
+public class UserController {
+
+    @GetMapping("/{id}")
+    public ResponseEntity<User> getUser(@PathVariable Long id) {
+        return ResponseEntity.ok(userService.findById(id));
+    }
+
+    @PostMapping("")
+    public User createUser(@RequestBody User user) {
+        return userService.save(user);
+    }
+
+    @RequestMapping(value = "/{id}", method = RequestMethod.DELETE)
+    public ResponseEntity<Void> deleteUser(@PathVariable Long id) {
+        return ResponseEntity.noContent().build();
+    }
+}
+"""
+
+
+def test_empty_repository_has_no_endpoints(tmp_path):
+    assert EndpointParser().parse_endpoints(str(tmp_path))["endpoints"] == []
+
+
+def test_missing_repository_has_no_endpoints(tmp_path):
+    assert EndpointParser().parse_endpoints(str(tmp_path / "missing"))["endpoints"] == []
+
+
+def test_every_endpoint_has_the_endpoint_info_keys(tmp_path):
+    source_dir = tmp_path / "src" / "main" / "java" / "com" / "example" / "demo"
+    source_dir.mkdir(parents=True)
+    (source_dir / "UserController.java").write_text(USER_CONTROLLER, encoding="utf-8")
+    # Unparseable sources must not drop keys from the endpoints that are found
+    (source_dir / "Broken.java").write_text("@RestController public class {{ @GetMapping(", encoding="utf-8")
+    (source_dir / "Binary.java").write_bytes(b"\xff\xfe\x00@GetMapping(\x80")
+
+    endpoints = EndpointParser().parse_endpoints(str(tmp_path))["endpoints"]
+
+    assert endpoints
+    for endpoint in endpoints:
+        assert ENDPOINT_KEYS <= endpoint.keys()
+        assert all(isinstance(endpoint[key], str) for key in ENDPOINT_KEYS)
+    assert {(e["http_method"], e["method"]) for e in endpoints} >= {("GET", "getUser"), ("POST", "createUser")}